@@ -1,6 +1,68 @@
+import hashlib
+import os
+import pickle
 import sys
 
-from functions.builtinfun import run
+from functions.builtinfun import parse, run_ast
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "sentience")
+# A pickled AST is only valid for the lexer, parser and node classes that built it
+PARSER_MODULES = (
+    "core/lexer.py",
+    "core/parser.py",
+    "core/nodes.py",
+    "core/ai_nodes.py",
+    "utils/constants.py",
+)
+
+
+def cache_path(filename):
+    """Return the AST cache file for this program.
+
+    Each program has a single file, named after its absolute path, that is overwritten
+    whenever the program or the parser changes, so stale ASTs are never kept around:
+    the cache holds at most one file per program that was run.
+    """
+    name = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{name}.ast.pkl")
+
+
+def source_key(filename, code):
+    """Return the key of this program's source and the current parser sources."""
+    key = hashlib.sha1(f"{filename}\0{code}".encode())
+    root = os.path.dirname(os.path.abspath(__file__))
+    for module in PARSER_MODULES:
+        key.update(str(os.stat(os.path.join(root, module)).st_mtime_ns).encode())
+    return key.hexdigest()
+
+
+def load_ast(filename, code):
+    """Parse code, reusing the AST pickled by an earlier run of the same program."""
+    path = cache_path(filename)
+    key = source_key(filename, code)
+    try:
+        with open(path, "rb") as f:
+            cached_key, node = pickle.load(f)
+        if cached_key == key:
+            return node, None
+    except Exception:
+        pass
+
+    node, error = parse(filename, code)
+    if error:
+        return None, error
+
+    # Caching is best effort, e.g. the home directory may be read-only
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((key, node), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        pass
+    return node, None
+
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
@@ -15,7 +77,9 @@ if __name__ == "__main__":
         print(f"Error: File '{filename}' not found.")
         sys.exit(1)
 
-    result, error = run(filename, code)
+    node, error = load_ast(filename, code)
+    if not error:
+        result, error = run_ast(node)
     if error:
         print(error.as_string())
     else:
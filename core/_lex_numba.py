@@ -0,0 +1,445 @@
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from utils.constants import DIGITS, KEYWORDS, LETTERS, WHITESPACE
+
+#######################################
+# TOKEN KINDS
+#######################################
+
+# Integer codes for the token types the scanner emits; core.lexer maps them back
+K_INT = 0
+K_FLOAT = 1
+K_STRING = 2
+K_IDENTIFIER = 3
+K_NEWLINE = 4
+K_PLUS = 5
+K_MINUS = 6
+K_ARROW = 7
+K_MUL = 8
+K_DIV = 9
+K_POW = 10
+K_LPAREN = 11
+K_RPAREN = 12
+K_LSQUARE = 13
+K_RSQUARE = 14
+K_COMMA = 15
+K_EQ = 16
+K_EE = 17
+K_NE = 18
+K_LT = 19
+K_LTE = 20
+K_GT = 21
+K_GTE = 22
+K_KEYWORD = 23
+
+#######################################
+# CHARACTER CLASSES
+#######################################
+
+# What a token starting with a given character is; see char_classes
+C_ILLEGAL = 0
+C_WHITESPACE = 1
+C_DIGIT = 2
+C_LETTER = 3
+C_QUOTE = 4
+C_COMMENT = 5
+C_NEWLINE = 6
+C_MINUS = 7
+C_BANG = 8
+C_EQUALS = 9
+C_LESS = 10
+C_GREATER = 11
+# A character that is a whole token by itself has class C_SINGLE + its kind
+C_SINGLE = 16
+
+SINGLE_CHAR_KINDS = {
+    "+": K_PLUS,
+    "*": K_MUL,
+    "/": K_DIV,
+    "^": K_POW,
+    "(": K_LPAREN,
+    ")": K_RPAREN,
+    "[": K_LSQUARE,
+    "]": K_RSQUARE,
+    ",": K_COMMA,
+}
+
+
+def char_classes():
+    """Return the class of every character code below 256 as a uint8 array.
+
+    Both lexers dispatch on this one table, so they agree on what starts a token.
+    Characters of class C_ILLEGAL, and any code of 256 or more, are illegal.
+    """
+    classes = np.zeros(256, dtype=np.uint8)
+    for chars, char_class in (
+        (WHITESPACE, C_WHITESPACE),
+        (DIGITS, C_DIGIT),
+        (LETTERS, C_LETTER),
+        ('"', C_QUOTE),
+        ("#", C_COMMENT),
+        (";\n", C_NEWLINE),
+        ("-", C_MINUS),
+        ("!", C_BANG),
+        ("=", C_EQUALS),
+        ("<", C_LESS),
+        (">", C_GREATER),
+    ):
+        for char in chars:
+            classes[ord(char)] = char_class
+    for char, kind in SINGLE_CHAR_KINDS.items():
+        classes[ord(char)] = C_SINGLE + kind
+    return classes
+
+
+CHAR_CLASSES = char_classes()
+
+
+def escape_table():
+    """Return the character each character code below 256 stands for after a
+    backslash in a string, as a uint8 array; core.lexer.ESCAPE_CHARACTERS lists the
+    ones that change."""
+    escapes = np.arange(256, dtype=np.uint8)
+    for char, escaped in (("n", "\n"), ("t", "\t"), ('"', '"')):
+        escapes[ord(char)] = ord(escaped)
+    return escapes
+
+
+ESCAPES = escape_table()
+
+#######################################
+# TOKEN TABLE
+#######################################
+
+# Rows of the token table, one column per token
+KIND = 0
+START_IDX = 1
+START_LN = 2
+START_COL = 3
+END_IDX = 4
+END_LN = 5
+END_COL = 6
+# Where a string token's value lies in the scanner's decoded string buffer
+VALUE_START = 7
+VALUE_END = 8
+FIELDS = 9
+
+# Scan results that send the source back to the Python lexer
+SCAN_OK = 0
+SCAN_FALLBACK = 1
+
+
+#######################################
+# SCANNER
+#######################################
+
+
+def _is_letter(c):
+    return 65 <= c <= 90 or 97 <= c <= 122
+
+
+def _is_digit(c):
+    return 48 <= c <= 57
+
+
+# SWAR ("SIMD within a register") masks: a byte value repeated in every lane of a word
+ONES = np.uint64(0x0101010101010101)
+HIGHS = np.uint64(0x8080808080808080)
+CASE_BITS = np.uint64(0x2020202020202020)
+
+
+def _in_range(word, lo, hi):
+    """Set the high bit of every byte of word within [lo, hi]; bytes must be ASCII."""
+    at_least_lo = word + ONES * np.uint64(128 - lo)
+    above_hi = word + ONES * np.uint64(127 - hi)
+    return at_least_lo & ~above_hi & HIGHS
+
+
+def _skip_digits(buf, words, i, n):
+    """Return the index of the first non-digit at or after i, eight bytes at a time."""
+    while i < n and i & 7:
+        if not _is_digit(buf[i]):
+            return i
+        i += 1
+    while i + 8 <= n and _in_range(words[i >> 3], 48, 57) == HIGHS:
+        i += 8
+    while i < n and _is_digit(buf[i]):
+        i += 1
+    return i
+
+
+def _skip_identifier(buf, words, i, n):
+    """Return the index of the first character that cannot continue an identifier."""
+    while i < n and i & 7:
+        c = buf[i]
+        if not (_is_letter(c) or _is_digit(c) or c == 95):
+            return i
+        i += 1
+    while i + 8 <= n:
+        word = words[i >> 3]
+        matched = (
+            _in_range(word | CASE_BITS, 97, 122)
+            | _in_range(word, 48, 57)
+            | _in_range(word, 95, 95)
+        )
+        if matched != HIGHS:
+            break
+        i += 8
+    while i < n and (_is_letter(buf[i]) or _is_digit(buf[i]) or buf[i] == 95):
+        i += 1
+    return i
+
+
+def _find_any(buf, words, i, n, a, b, c):
+    """Return the index of the first of bytes a, b or c at or after i, or n."""
+    while i < n and i & 7:
+        if buf[i] == a or buf[i] == b or buf[i] == c:
+            return i
+        i += 1
+    while i + 8 <= n:
+        word = words[i >> 3]
+        if _in_range(word, a, a) | _in_range(word, b, b) | _in_range(word, c, c):
+            break
+        i += 8
+    while i < n and buf[i] != a and buf[i] != b and buf[i] != c:
+        i += 1
+    return i
+
+
+def keyword_table(keywords):
+    """Return the tables '_is_keyword' matches identifiers against.
+
+    buckets[length, first byte] lists the keywords with that length and first letter
+    as row indexes into spellings, padded with -1; spellings holds the keywords'
+    bytes. Keywords rarely share both, so an identifier is compared with at most a
+    couple of candidates, and only when one exists.
+    """
+    max_length = max(len(keyword) for keyword in keywords)
+    groups = {}
+    for idx, keyword in enumerate(keywords):
+        groups.setdefault((len(keyword), ord(keyword[0])), []).append(idx)
+
+    buckets = np.full(
+        (max_length + 1, 128, max(len(group) for group in groups.values())),
+        -1,
+        dtype=np.int32,
+    )
+    for (length, first), group in groups.items():
+        buckets[length, first, : len(group)] = group
+
+    spellings = np.zeros((len(keywords), max_length), dtype=np.uint8)
+    for idx, keyword in enumerate(keywords):
+        spellings[idx, : len(keyword)] = np.frombuffer(keyword.encode(), np.uint8)
+    return buckets, spellings
+
+
+KEYWORD_BUCKETS, KEYWORD_SPELLINGS = keyword_table(KEYWORDS)
+
+
+def _is_keyword(buf, start, end, buckets, spellings):
+    length = end - start
+    if length >= buckets.shape[0]:
+        return False
+    for slot in range(buckets.shape[2]):
+        keyword = buckets[length, buf[start], slot]
+        if keyword < 0:
+            return False
+        matched = True
+        for offset in range(1, length):
+            if spellings[keyword, offset] != buf[start + offset]:
+                matched = False
+                break
+        if matched:
+            return True
+    return False
+
+
+def _scan(buf, words, classes, escapes, keyword_buckets, keyword_spellings):
+    """Tokenize an ASCII source held in a uint8 array.
+
+    words views the same bytes, zero padded to a multiple of eight, as uint64s;
+    runs of digits, identifier characters and string or comment text are skipped a
+    word at a time.
+
+    Returns a (FIELDS, n) table holding one row per token field, the number of tokens,
+    the decoded contents of every string, which VALUE_START and VALUE_END index, a
+    status and the index, line and column the scan ended at. Escaped characters are
+    translated through escapes (ESCAPES).
+
+    Tokens are told apart by the class of their first character, looked up in
+    classes (CHAR_CLASSES). Positions follow core.lexer.Position: a newline moves to
+    the next line once it has been consumed. Identifiers matching keyword_table's tables become K_KEYWORD.
+    Anything the Python lexer reports as an error yields SCAN_FALLBACK.
+    """
+    n = buf.shape[0]
+    tokens = np.empty((FIELDS, n // 4 + 16), dtype=np.int64)
+    count = 0
+    strings = np.empty(n, dtype=np.uint8)
+    out = 0
+    i = 0
+    ln = 0
+    col = 0
+
+    while i < n:
+        c = buf[i]
+        char_class = classes[c]
+
+        if char_class == C_WHITESPACE:
+            i += 1
+            col += 1
+            continue
+
+        if char_class == C_COMMENT:  # skipped along with its newline
+            j = _find_any(buf, words, i + 1, n, 10, 10, 10)
+            if j == n:
+                col += n - i
+                i = n
+            else:
+                i = j + 1
+                ln += 1
+                col = 0
+            continue
+
+        if count == tokens.shape[1]:
+            grown = np.empty((FIELDS, tokens.shape[1] * 2), dtype=np.int64)
+            grown[:, :count] = tokens[:, :count]
+            tokens = grown
+
+        start_i = i
+        start_ln = ln
+        start_col = col
+        value_start = out
+
+        if char_class >= C_SINGLE or char_class == C_NEWLINE:
+            if char_class == C_NEWLINE:
+                kind = K_NEWLINE
+            else:
+                kind = char_class - C_SINGLE
+            i += 1
+            if c == 10:
+                ln += 1
+                col = 0
+            else:
+                col += 1
+            # Single character tokens end one column after their start, newlines too
+            end_i = start_i + 1
+            end_ln = start_ln
+            end_col = start_col + 1
+
+        else:
+            if char_class == C_DIGIT:
+                kind = K_INT
+                i = _skip_digits(buf, words, i + 1, n)
+                if i < n and buf[i] == 46:  # '.'
+                    kind = K_FLOAT
+                    i = _skip_digits(buf, words, i + 1, n)
+
+            elif char_class == C_LETTER:
+                kind = K_IDENTIFIER
+                i = _skip_identifier(buf, words, i + 1, n)
+                if _is_keyword(buf, start_i, i, keyword_buckets, keyword_spellings):
+                    kind = K_KEYWORD
+
+            elif char_class == C_QUOTE:
+                kind = K_STRING
+                i += 1
+                col += 1
+                while True:
+                    # Plain characters only move the column
+                    j = _find_any(buf, words, i, n, 34, 92, 10)
+                    strings[out : out + j - i] = buf[i:j]
+                    out += j - i
+                    col += j - i
+                    i = j
+                    if i >= n or buf[i] == 34:
+                        break
+                    if buf[i] == 92:  # backslash escapes the next char
+                        if i + 1 < n:
+                            i += 1
+                            col += 1
+                            strings[out] = escapes[buf[i]]
+                            out += 1
+                        # A backslash ending the source is dropped
+                    else:
+                        strings[out] = buf[i]
+                        out += 1
+                    if buf[i] == 10:
+                        ln += 1
+                        col = 0
+                    else:
+                        col += 1
+                    i += 1
+                # The closing quote, or the end of the source, is consumed as well
+                i += 1
+                col += 1
+
+            elif char_class == C_MINUS:  # '-' or '->'
+                kind = K_MINUS
+                i += 1
+                if i < n and buf[i] == 62:
+                    kind = K_ARROW
+                    i += 1
+
+            elif (
+                char_class == C_EQUALS
+                or char_class == C_LESS
+                or char_class == C_GREATER
+            ):
+                # '=', '<', '>' and their '=' forms
+                if char_class == C_EQUALS:
+                    kind = K_EQ
+                elif char_class == C_LESS:
+                    kind = K_LT
+                else:
+                    kind = K_GT
+                i += 1
+                if i < n and buf[i] == 61:
+                    kind += 1
+                    i += 1
+
+            elif char_class == C_BANG:  # '!='
+                if i + 1 < n and buf[i + 1] == 61:
+                    kind = K_NE
+                    i += 2
+                else:
+                    return tokens, count, strings, SCAN_FALLBACK, i, ln, col
+
+            else:
+                return tokens, count, strings, SCAN_FALLBACK, i, ln, col
+
+            if kind != K_STRING:
+                col += i - start_i
+            end_i = i
+            end_ln = ln
+            end_col = col
+
+        tokens[KIND, count] = kind
+        tokens[START_IDX, count] = start_i
+        tokens[START_LN, count] = start_ln
+        tokens[START_COL, count] = start_col
+        tokens[END_IDX, count] = end_i
+        tokens[END_LN, count] = end_ln
+        tokens[END_COL, count] = end_col
+        tokens[VALUE_START, count] = value_start
+        tokens[VALUE_END, count] = out
+        count += 1
+
+    return tokens, count, strings[:out], SCAN_OK, i, ln, col
+
+
+if numba is not None:
+    _is_letter = numba.njit(cache=True)(_is_letter)
+    _is_digit = numba.njit(cache=True)(_is_digit)
+    _is_keyword = numba.njit(cache=True)(_is_keyword)
+    _in_range = numba.njit(cache=True)(_in_range)
+    _skip_digits = numba.njit(cache=True)(_skip_digits)
+    _skip_identifier = numba.njit(cache=True)(_skip_identifier)
+    _find_any = numba.njit(cache=True)(_find_any)
+    scan = numba.njit(cache=True)(_scan)
+else:
+    scan = None
@@ -1,4 +1,6 @@
 class EmbedNode:
+    __slots__ = ("text_node", "model_node", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, text_node, model_node=None):
         self.text_node = text_node
         self.model_node = model_node
@@ -11,6 +13,8 @@ class EmbedNode:
         return f'(EMBED {self.text_node})'
 
 class AICallNode:
+    __slots__ = ("model_name", "args", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, model_name, args):
         self.model_name = model_name
         self.args = args
@@ -21,6 +25,8 @@ class AICallNode:
         return f'(AI {self.model_name} {self.args})'
 
 class PipeNode:
+    __slots__ = ("left_node", "right_node", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, left_node, right_node):
         self.left_node = left_node
         self.right_node = right_node
@@ -1,36 +1,270 @@
+from collections import OrderedDict, deque
+import hashlib
+import os
+
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from core.values import String, List, Number
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+from core.values import Embedding, String, List, Number, Value
 from utils.errors import RTError
 
+# Storage formats picked with a model name suffix, e.g. EMBED text WITH "default-int8"
+PRECISIONS = ('fp16', 'int8')
+
+def embedding_device():
+    """Return the device for embedding models: $SENTIENCE_DEVICE, else CUDA when present."""
+    device = os.environ.get('SENTIENCE_DEVICE')
+    if device:
+        return device
+    try:
+        import torch
+    except ImportError:
+        return 'cpu'
+    return 'cuda' if torch.cuda.is_available() else 'cpu'
+
 class EmbeddingManager:
-    def __init__(self):
-        self.default_model = SentenceTransformer('all-MiniLM-L6-v2')
+    _shared = None
+
+    @classmethod
+    def instance(cls):
+        """Return the manager shared by every interpreter, loading the model on first use.
+
+        Setting $SENTIENCE_EMBED_FUZZY_THRESHOLD turns on the near-duplicate cache lookup.
+        """
+        if cls._shared is None:
+            threshold = os.environ.get('SENTIENCE_EMBED_FUZZY_THRESHOLD')
+            cls._shared = cls(fuzzy_threshold=float(threshold) if threshold else None)
+        return cls._shared
+
+    def __init__(self, cache_size=4096, fuzzy_threshold=None, fuzzy_window=256):
+        self.device = embedding_device()
+        self.default_model = SentenceTransformer('all-MiniLM-L6-v2', device=self.device)
+        if self.device.startswith('cuda'):
+            # Half precision runs on the tensor cores; encode results are cast back to float32
+            self.default_model.half()
         self.models = {
             'default': self.default_model
         }
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        # Near-duplicate lookup is opt-in: a hit returns the vector of a different text
+        self.fuzzy_threshold = fuzzy_threshold
+        self._recent = deque(maxlen=fuzzy_window)
+
+    def _cache_key(self, text, model_name):
+        return (model_name, hashlib.blake2b(text.encode(), digest_size=16).digest())
+
+    def _shingles(self, text, size=3):
+        """Return the character n-gram sketch of text, ignoring case and whitespace runs."""
+        normalized = " ".join(text.lower().split())
+        if len(normalized) <= size:
+            return {normalized}
+        return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+    def _cache_get(self, key, text):
+        """Return a copy of the cached vector for text, or None on a miss.
+
+        Exact hits are looked up by key. When fuzzy_threshold is set, a miss falls back to
+        the recently encoded text whose shingle Jaccard similarity is highest and at least
+        the threshold. The threshold compares characters, not meanings: "was good" and
+        "was not good" already score about 0.74. A borrowed vector is never cached under
+        the new text's key, so the next lookup of that text is decided afresh.
+        """
+        array = self._cache.get(key)
+        if array is not None:
+            self._cache.move_to_end(key)
+            return array.copy()
+
+        if self.fuzzy_threshold is None:
+            return None
+
+        model_name = key[0]
+        shingles = self._shingles(text)
+        best_score = self.fuzzy_threshold
+        for recent_model, recent_shingles, recent_array in self._recent:
+            if recent_model != model_name:
+                continue
+            score = len(shingles & recent_shingles) / len(shingles | recent_shingles)
+            if score >= best_score:
+                array, best_score = recent_array, score
+
+        if array is None:
+            return None
+        return array.copy()
+
+    def _cache_put(self, key, text, array):
+        """Store a vector, evicting the least recently used entry when full."""
+        self._cache[key] = array
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        if self.fuzzy_threshold is not None:
+            self._recent.append((key[0], self._shingles(text), array))
     
+    def _split_precision(self, model_name):
+        """Split a model name like 'default-int8' into the model and its storage format."""
+        if model_name not in self.models:
+            base, sep, precision = model_name.rpartition('-')
+            if sep and precision in PRECISIONS:
+                return base or 'default', precision
+        return model_name, None
+
+    def _to_embedding(self, array, precision):
+        """Wrap a unit-length float32 vector, quantizing it to float16 or int8 when asked to.
+
+        int8 rounding moves the vector off unit length, so it is not flagged as normalized.
+        """
+        if precision == 'fp16':
+            return Embedding(array.astype(np.float16), normalized=True)
+        if precision == 'int8':
+            max_abs = float(np.max(np.abs(array))) if array.size else 0.0
+            scale = max_abs / 127 if max_abs else 1.0
+            return Embedding(np.clip(np.rint(array / scale), -127, 127).astype(np.int8), scale)
+        return Embedding(array, normalized=True)
+
     def embed(self, text, model_name='default'):
         """Generate embeddings for the given text."""
-        model = self.models.get(model_name, self.default_model)
-        embedding = model.encode(text)
-        return List([Number(float(x)) for x in embedding])
+        model_name, precision = self._split_precision(model_name)
+        key = self._cache_key(text, model_name)
+        array = self._cache_get(key, text)
+        if array is None:
+            model = self.models.get(model_name, self.default_model)
+            array = model.encode(
+                text, convert_to_numpy=True, normalize_embeddings=True
+            ).astype(np.float32, copy=False)
+            self._cache_put(key, text, array)
+            array = array.copy()
+        return self._to_embedding(array, precision)
+
+    def embed_batch(self, texts, model_name='default', batch_size=32):
+        """Generate embeddings for several texts with a single encode call.
+
+        Cached texts are served from the cache; only the misses are sent to the model.
+        """
+        model_name, precision = self._split_precision(model_name)
+        keys = [self._cache_key(text, model_name) for text in texts]
+        arrays = [self._cache_get(key, text) for key, text in zip(keys, texts)]
+        missing = [i for i, array in enumerate(arrays) if array is None]
+
+        if missing:
+            model = self.models.get(model_name, self.default_model)
+            encoded = model.encode(
+                [texts[i] for i in missing], batch_size=batch_size,
+                convert_to_numpy=True, normalize_embeddings=True
+            ).astype(np.float32, copy=False)
+            for i, array in zip(missing, encoded):
+                self._cache_put(keys[i], texts[i], array)
+                arrays[i] = array.copy()
+
+        return [self._to_embedding(array, precision) for array in arrays]
+
+    def as_array(self, vec):
+        """Return the buffer behind an Embedding or List value."""
+        if isinstance(vec, Embedding) and vec.vector is not None:
+            return vec.vector.array
+        if isinstance(vec, List):
+            # The list keeps this float32 copy until its elements change, including
+            # an embedding whose elements were built for a list operation
+            array = vec._np
+            if array is None:
+                raise ValueError("Lists must contain only numbers")
+            return array
+        raise ValueError("Both arguments must be embeddings or lists")
+
+    def is_normalized(self, vec):
+        """Return whether vec is an embedding still known to have unit length."""
+        return isinstance(vec, Embedding) and vec.vector is not None and vec.vector.normalized
 
     def cosine_similarity(self, vec1, vec2):
-        """Calculate cosine similarity between two vectors."""
-        if not isinstance(vec1, List) or not isinstance(vec2, List):
-            raise ValueError("Both arguments must be lists")
-        
-        v1 = np.array([x.value for x in vec1.elements])
-        v2 = np.array([x.value for x in vec2.elements])
-        
-        similarity = np.dot(v1, v2) / (np.linalg.norm(v1) * np.linalg.norm(v2))
+        """Calculate cosine similarity between two vectors.
+
+        Quantized vectors are compared in their own format when both sides share it. Cosine
+        ignores the length of each vector, so the int8 scale never has to be applied.
+        Embeddings are normalized when they are created, so two of them only need a dot
+        product.
+        """
+        v1 = self.as_array(vec1)
+        v2 = self.as_array(vec2)
+        if v1.dtype != v2.dtype or simsimd is None:
+            v1 = v1.astype(np.float32, copy=False)
+            v2 = v2.astype(np.float32, copy=False)
+
+        if self.is_normalized(vec1) and self.is_normalized(vec2):
+            similarity = simsimd.dot(v1, v2) if simsimd is not None else np.dot(v1, v2)
+        elif simsimd is not None:
+            similarity = 1.0 - simsimd.cosine(v1, v2)
+        else:
+            similarity = np.dot(v1, v2) / np.sqrt(np.vdot(v1, v1) * np.vdot(v2, v2))
         return Number(float(similarity))
 
+    def dot_product(self, vec1, vec2):
+        """Calculate the dot product of two vectors.
+
+        Unlike cosine similarity this depends on the lengths of the vectors, so int8
+        embeddings are scaled back to float32 first.
+        """
+        v1 = self._float_array(vec1)
+        v2 = self._float_array(vec2)
+        return Number(float(np.dot(v1, v2)))
+
+    def _float_array(self, vec):
+        """Return the values of an Embedding or List value, with any int8 scale applied."""
+        if isinstance(vec, Embedding) and vec.vector is not None:
+            return vec.vector.to_float32()
+        return self.as_array(vec)
+
+    def similarity_matrix(self, list1, list2):
+        """Return the cosine similarity of every pair of vectors from two lists.
+
+        Both lists are stacked into float32 matrices and normalized row by row, so the
+        whole N x M result is one matrix product (SGEMM) instead of N * M calls to
+        cosine_similarity. The result is a List of N rows of M Numbers.
+        """
+        if not isinstance(list1, List) or not isinstance(list2, List):
+            raise ValueError("Both arguments must be lists of embeddings or lists")
+        if not list1.elements or not list2.elements:
+            return List([List([]) for _ in list1.elements])
+
+        rows = [
+            [self.as_array(vec) for vec in vectors]
+            for vectors in (list1.elements, list2.elements)
+        ]
+        if len({len(row) for row in rows[0] + rows[1]}) > 1:
+            raise ValueError("All vectors must have the same length")
+
+        matrices = []
+        for row in rows:
+            matrix = np.stack(row).astype(np.float32, copy=False)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            # A zero vector stays zero, so its similarities are 0 as in cosine_similarity
+            matrices.append(
+                np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+            )
+
+        similarities = matrices[0] @ matrices[1].T
+        return List([List([Number(x) for x in row]) for row in similarities.tolist()])
+
 class AIManager:
+    _shared = None
+
+    @classmethod
+    def instance(cls):
+        """Return the manager shared by every interpreter, so registered models persist."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
     def __init__(self):
         self.models = {}
-        self.embedding_manager = EmbeddingManager()
+        self.embedding_manager = EmbeddingManager.instance()
+        self.register_model('cosine_similarity', self.embedding_manager.cosine_similarity)
+        self.register_model('dot_product', self.embedding_manager.dot_product)
+        self.register_model('similarity_matrix', self.embedding_manager.similarity_matrix)
     
     def register_model(self, name, model):
         """Register a new model."""
@@ -47,7 +281,9 @@ class AIManager:
         
         try:
             result = self.models[model_name](*args)
-            if isinstance(result, str):
+            if isinstance(result, Value):
+                return result, None
+            elif isinstance(result, str):
                 return String(result), None
             elif isinstance(result, (int, float)):
                 return Number(result), None
@@ -0,0 +1,408 @@
+from weakref import WeakKeyDictionary
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from utils.constants import (
+    TT_DIV,
+    TT_EE,
+    TT_GT,
+    TT_GTE,
+    TT_KEYWORD,
+    TT_LT,
+    TT_LTE,
+    TT_MINUS,
+    TT_MUL,
+    TT_NE,
+    TT_PLUS,
+    TT_POW,
+)
+
+#######################################
+# CONSTANTS
+#######################################
+
+# Static types tracked to decide whether a function is safe to hand to Numba
+INT = "int"
+FLOAT = "float"
+MIXED = "mixed"
+
+ARITH_OPS = {TT_PLUS: "+", TT_MINUS: "-", TT_MUL: "*", TT_DIV: "/", TT_POW: "**"}
+COMPARISON_OPS = {
+    TT_EE: "==",
+    TT_NE: "!=",
+    TT_LT: "<",
+    TT_GT: ">",
+    TT_LTE: "<=",
+    TT_GTE: ">=",
+}
+
+
+def _and(a, b):
+    return int(a and b)
+
+
+def _or(a, b):
+    return int(a or b)
+
+
+PY_HELPERS = {"_and": _and, "_or": _or}
+
+if numba is not None:
+    NUMBA_HELPERS = {"_and": numba.njit(_and), "_or": numba.njit(_or)}
+
+
+class CodegenError(Exception):
+    """Raised when a function body uses a construct outside the numeric subset."""
+
+
+def join_types(a, b):
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    return MIXED
+
+
+def promote_types(a, b):
+    if MIXED in (a, b):
+        return MIXED
+    if a is None or b is None:
+        return None
+    return INT if a == b == INT else FLOAT
+
+
+#######################################
+# CODE GENERATOR
+#######################################
+
+
+class PyCodegen:
+    """Translates a numeric function body into the source of a Python function.
+
+    Only side-effect-free code is accepted: number literals, the function's own
+    arguments and local variables, arithmetic, comparisons, logic, IF, FOR, WHILE,
+    RETURN, BREAK and CONTINUE. Every operation follows the corresponding Number
+    method, so the generated function returns exactly what the interpreter would,
+    or raises where the interpreter would report an error.
+    """
+
+    def __init__(self, arg_names):
+        self.arg_names = arg_names
+        self.var_types = {name: FLOAT for name in arg_names}
+        self.locals = set(arg_names)
+
+    def generate(self, body_node, should_auto_return):
+        """Return the source and whether float arguments keep every value float64."""
+        self.collect_locals(body_node)
+
+        # Assignments later in a loop feed earlier reads, so iterate to a fixed point
+        for _ in range(len(self.locals) + 2):
+            self.reset()
+            if should_auto_return:
+                value, value_type = self.expr(body_node)
+                self.line(f"return {value}")
+                self.return_types.add(value_type)
+            else:
+                self.block(body_node)
+                if not self.ends_with_return(body_node):
+                    self.line("return None")
+                    self.return_types.add(None)
+
+            new_types = dict(self.var_types)
+            for name, assigned_type in self.assigned_types.items():
+                new_types[name] = join_types(new_types.get(name), assigned_type)
+            if new_types == self.var_types:
+                break
+            self.var_types = new_types
+
+        params = ", ".join(f"v_{name}" for name in self.arg_names)
+        source = f"def native({params}):\n" + "\n".join(self.lines) + "\n"
+        float_safe = (
+            self.float_safe
+            and self.return_types == {FLOAT}
+            and all(
+                var_type == FLOAT
+                for name, var_type in self.var_types.items()
+                if name not in self.loop_vars
+            )
+            and all(self.var_types[name] in (INT, FLOAT) for name in self.loop_vars)
+        )
+        return source, float_safe
+
+    def ends_with_return(self, body_node):
+        if type(body_node).__name__ == "ListNode" and body_node.element_nodes:
+            body_node = body_node.element_nodes[-1]
+        return type(body_node).__name__ == "ReturnNode"
+
+    def reset(self):
+        self.lines = []
+        self.indent = 1
+        self.loop_depth = 0
+        self.temp_count = 0
+        self.float_safe = True
+        self.return_types = set()
+        self.assigned_types = {}
+        self.loop_vars = set()
+        # Names certainly bound at this point; Numba reads unbound locals as garbage
+        self.bound = set(self.arg_names)
+
+    def collect_locals(self, node):
+        """Record every variable the body assigns; any other name is a global."""
+        if isinstance(node, (list, tuple)):
+            for child in node:
+                self.collect_locals(child)
+            return
+        name = type(node).__name__
+        if name in ("VarAssignNode", "ForNode"):
+            self.locals.add(node.var_name_tok.value)
+        elif not name.endswith("Node"):
+            return
+        for attr in node.__slots__:
+            self.collect_locals(getattr(node, attr))
+
+    def line(self, text):
+        self.lines.append("    " * self.indent + text)
+
+    def temp(self):
+        self.temp_count += 1
+        return f"_t{self.temp_count}"
+
+    def assign(self, name, value_type):
+        self.assigned_types[name] = join_types(
+            self.assigned_types.get(name), value_type
+        )
+
+    ###################################
+
+    def block(self, node):
+        """Emit a statement or a block of statements whose values are discarded."""
+        start = len(self.lines)
+        if type(node).__name__ == "ListNode":
+            for element_node in node.element_nodes:
+                self.statement(element_node)
+        else:
+            self.statement(node)
+        if len(self.lines) == start:
+            self.line("pass")
+
+    def statement(self, node):
+        name = type(node).__name__
+
+        if name == "VarAssignNode":
+            value, value_type = self.expr(node.value_node)
+            var_name = node.var_name_tok.value
+            self.assign(var_name, value_type)
+            self.bound.add(var_name)
+            self.line(f"v_{var_name} = {value}")
+
+        elif name == "IfNode":
+            before = self.bound
+            branches = []
+            keyword = "if"
+            for condition, expr, _ in node.cases:
+                self.bound = set(before)
+                value, _ = self.expr(condition)
+                self.line(f"{keyword} ({value}) != 0:")
+                self.indent += 1
+                self.block(expr)
+                self.indent -= 1
+                branches.append(self.bound)
+                keyword = "elif"
+            if node.else_case:
+                self.line("else:")
+                self.bound = set(before)
+                self.indent += 1
+                self.block(node.else_case[0])
+                self.indent -= 1
+                branches.append(self.bound)
+            else:
+                branches.append(before)
+            self.bound = set.intersection(*branches)
+
+        elif name == "ForNode":
+            var_name = node.var_name_tok.value
+            start, start_type = self.expr(node.start_value_node)
+            end, _ = self.expr(node.end_value_node)
+            if node.step_value_node:
+                step, step_type = self.expr(node.step_value_node)
+            else:
+                step, step_type = "1", INT
+
+            if start_type == FLOAT and step_type in (INT, FLOAT):
+                var_type = FLOAT
+            elif start_type == INT and step_type == INT:
+                var_type = INT
+            else:
+                var_type = MIXED
+            self.assign(var_name, var_type)
+            self.loop_vars.add(var_name)
+
+            i, end_var, step_var = self.temp(), self.temp(), self.temp()
+            self.line(f"{i} = {start}")
+            self.line(f"{end_var} = {end}")
+            self.line(f"{step_var} = {step}")
+            self.line(
+                f"while ({i} < {end_var}) if {step_var} >= 0 else ({i} > {end_var}):"
+            )
+            self.indent += 1
+            self.line(f"v_{var_name} = {i}")
+            self.line(f"{i} = {i} + {step_var}")
+            self.loop_body(node.body_node, var_name)
+            self.indent -= 1
+
+        elif name == "WhileNode":
+            value, _ = self.expr(node.condition_node)
+            self.line(f"while ({value}) != 0:")
+            self.indent += 1
+            self.loop_body(node.body_node)
+            self.indent -= 1
+
+        elif name == "ReturnNode":
+            if node.node_to_return:
+                value, value_type = self.expr(node.node_to_return)
+                self.return_types.add(value_type)
+                self.line(f"return {value}")
+            else:
+                self.return_types.add(None)
+                self.line("return None")
+
+        elif name in ("BreakNode", "ContinueNode"):
+            # Outside a loop these signals escape the caller; keep the interpreter path
+            if not self.loop_depth:
+                raise CodegenError(name)
+            self.line("break" if name == "BreakNode" else "continue")
+
+        else:
+            value, _ = self.expr(node)
+            self.line(value)
+
+    def loop_body(self, body_node, var_name=None):
+        before = self.bound
+        self.bound = before | {var_name} if var_name else set(before)
+        self.loop_depth += 1
+        self.block(body_node)
+        self.loop_depth -= 1
+        # The body may not run at all
+        self.bound = before
+
+    def expr(self, node):
+        """Return the source and static type of an expression."""
+        name = type(node).__name__
+
+        if name == "NumberNode":
+            value = node.tok.value
+            return repr(value), INT if isinstance(value, int) else FLOAT
+
+        if name == "VarAccessNode":
+            var_name = node.var_name_tok.value
+            if var_name not in self.locals:
+                raise CodegenError(f"global '{var_name}'")
+            if var_name not in self.bound:
+                self.float_safe = False
+            return f"v_{var_name}", self.var_types.get(var_name)
+
+        if name == "BinOpNode":
+            left, left_type = self.expr(node.left_node)
+            right, right_type = self.expr(node.right_node)
+            op_tok = node.op_tok
+
+            if op_tok.type in ARITH_OPS:
+                if op_tok.type == TT_POW:
+                    # Python returns complex where float64 would give nan
+                    self.float_safe = False
+                    result_type = None
+                elif op_tok.type == TT_DIV:
+                    result_type = FLOAT
+                else:
+                    result_type = promote_types(left_type, right_type)
+                    if result_type == INT:
+                        # Python ints never overflow, int64 does
+                        self.float_safe = False
+                return f"({left} {ARITH_OPS[op_tok.type]} {right})", result_type
+
+            if op_tok.type in COMPARISON_OPS:
+                return f"int({left} {COMPARISON_OPS[op_tok.type]} {right})", INT
+
+            if op_tok.type == TT_KEYWORD and op_tok.value in ("AND", "OR"):
+                helper = "_and" if op_tok.value == "AND" else "_or"
+                if left_type != INT or right_type != INT:
+                    # int() of a large float overflows int64, Python ints do not
+                    self.float_safe = False
+                return f"{helper}({left}, {right})", INT
+
+            raise CodegenError(f"operator {op_tok}")
+
+        if name == "UnaryOpNode":
+            value, value_type = self.expr(node.node)
+            if node.op_tok.type == TT_MINUS:
+                if value_type == INT:
+                    self.float_safe = False
+                return f"({value} * -1)", value_type
+            if node.op_tok.matches(TT_KEYWORD, "NOT"):
+                return f"(1 if {value} == 0 else 0)", INT
+            return value, value_type
+
+        raise CodegenError(name)
+
+
+#######################################
+# NATIVE FUNCTIONS
+#######################################
+
+
+class NativeFunction:
+    """A function body compiled to Python, plus a Numba twin for float calls."""
+
+    def __init__(self, source, arity, float_safe):
+        self.source = source
+        self.arity = arity
+        self.float_safe = float_safe and numba is not None
+        self.python = self.build(PY_HELPERS)
+        self.jitted = None
+
+    def build(self, helpers):
+        namespace = dict(helpers)
+        exec(compile(self.source, "<native>", "exec"), namespace)
+        return namespace["native"]
+
+    def jit(self):
+        """Compile the float64 specialisation, or return None if Numba rejects it."""
+        if self.jitted is None:
+            try:
+                signature = numba.float64(*([numba.float64] * self.arity))
+                self.jitted = numba.njit(signature)(self.build(NUMBA_HELPERS))
+            except Exception:
+                self.jitted = False
+        return self.jitted or None
+
+    def __call__(self, values):
+        """Run the body on raw values; raises wherever the interpreter would fail."""
+        if self.float_safe and all(type(value) is float for value in values):
+            jitted = self.jit()
+            if jitted is not None:
+                return jitted(*values)
+        return self.python(*values)
+
+
+_native_cache = WeakKeyDictionary()
+
+
+def compile_native(body_node, arg_names, should_auto_return):
+    """Compile a numeric function body, caching the result per body node.
+
+    Returns None when the body uses anything outside the numeric subset.
+    """
+    if body_node in _native_cache:
+        return _native_cache[body_node]
+    try:
+        source, float_safe = PyCodegen(arg_names).generate(
+            body_node, should_auto_return
+        )
+        native = NativeFunction(source, len(arg_names), float_safe)
+    except CodegenError:
+        native = None
+    _native_cache[body_node] = native
+    return native
@@ -0,0 +1,475 @@
+from weakref import WeakKeyDictionary
+
+from execution.runtime import (
+    RTBreak,
+    RTContinue,
+    RTException,
+    RTReturn,
+    loop_range,
+)
+from core.values import List, Number, String
+from utils.constants import (
+    TT_DIV,
+    TT_EE,
+    TT_GT,
+    TT_GTE,
+    TT_KEYWORD,
+    TT_LT,
+    TT_LTE,
+    TT_MINUS,
+    TT_MUL,
+    TT_NE,
+    TT_PLUS,
+    TT_POW,
+)
+
+#######################################
+# OPCODES
+#######################################
+
+LOAD_NUMBER = 0
+LOAD_STRING = 1
+LOAD_NULL = 2
+LOAD_VAR = 3
+STORE_VAR = 4
+BINARY_OP = 5
+UNARY_OP = 6
+BUILD_LIST = 7
+POP_TOP = 8
+JUMP = 9
+JUMP_IF_FALSE = 10
+CALL = 11
+RETURN_VALUE = 12
+SETUP_LOOP = 13
+FOR_SETUP = 14
+FOR_ITER = 15
+LOOP_APPEND = 16
+END_LOOP = 17
+BREAK_LOOP = 18
+CONTINUE_LOOP = 19
+EVAL = 20
+
+# END_LOOP modes
+LOOP_DISCARD = 0
+LOOP_NULL = 1
+LOOP_LIST = 2
+
+BINARY_OP_METHODS = {
+    TT_PLUS: "added_to",
+    TT_MINUS: "subbed_by",
+    TT_MUL: "multed_by",
+    TT_DIV: "dived_by",
+    TT_POW: "powed_by",
+    TT_EE: "get_comparison_eq",
+    TT_NE: "get_comparison_ne",
+    TT_LT: "get_comparison_lt",
+    TT_GT: "get_comparison_gt",
+    TT_LTE: "get_comparison_lte",
+    TT_GTE: "get_comparison_gte",
+}
+
+KEYWORD_OP_METHODS = {
+    "AND": "anded_by",
+    "OR": "ored_by",
+}
+
+
+#######################################
+# COMPILER
+#######################################
+
+
+class Compiler:
+    """Lowers an AST into a flat list of (opcode, arg, node) instructions.
+
+    Every compile_* method leaves exactly one value on the stack when 'keep' is True
+    and none when it is False. Nodes without a compile_* method are emitted as a single
+    EVAL instruction that hands the node back to the tree-walking interpreter.
+    """
+
+    def __init__(self):
+        self.code = []
+        self.loop_depth = 0
+
+    def emit(self, op, arg=None, node=None):
+        """Append an instruction and return its index."""
+        self.code.append([op, arg, node])
+        return len(self.code) - 1
+
+    def patch(self, index, arg):
+        """Set the argument of a previously emitted instruction."""
+        self.code[index][1] = arg
+
+    def compile(self, node, keep=True):
+        method = getattr(self, f"compile_{type(node).__name__}", self.compile_fallback)
+        method(node, keep)
+
+    def compile_fallback(self, node, keep):
+        self.emit(EVAL, node, node)
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_NumberNode(self, node, keep):
+        if keep:
+            self.emit(LOAD_NUMBER, node.tok.value, node)
+
+    def compile_StringNode(self, node, keep):
+        if keep:
+            self.emit(LOAD_STRING, node.tok.value, node)
+
+    def compile_ListNode(self, node, keep):
+        for element_node in node.element_nodes:
+            self.compile(element_node, keep)
+        if keep:
+            self.emit(BUILD_LIST, len(node.element_nodes), node)
+
+    def compile_VarAccessNode(self, node, keep):
+        self.emit(LOAD_VAR, node.var_name_tok.value, node)
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_VarAssignNode(self, node, keep):
+        self.compile(node.value_node)
+        self.emit(STORE_VAR, node.var_name_tok.value, node)
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_BinOpNode(self, node, keep):
+        op_tok = node.op_tok
+        if op_tok.type == TT_KEYWORD:
+            method_name = KEYWORD_OP_METHODS.get(op_tok.value)
+        else:
+            method_name = BINARY_OP_METHODS.get(op_tok.type)
+        if method_name is None:
+            self.compile_fallback(node, keep)
+            return
+
+        self.compile(node.left_node)
+        self.compile(node.right_node)
+        self.emit(BINARY_OP, method_name, node)
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_UnaryOpNode(self, node, keep):
+        self.compile(node.node)
+        if node.op_tok.type == TT_MINUS:
+            self.emit(UNARY_OP, "neg", node)
+        elif node.op_tok.matches(TT_KEYWORD, "NOT"):
+            self.emit(UNARY_OP, "not", node)
+        else:
+            self.emit(UNARY_OP, None, node)
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_IfNode(self, node, keep):
+        end_jumps = []
+
+        for condition, expr, should_return_null in node.cases:
+            self.compile(condition)
+            next_case = self.emit(JUMP_IF_FALSE)
+            self.compile_branch(expr, should_return_null, keep)
+            end_jumps.append(self.emit(JUMP))
+            self.patch(next_case, len(self.code))
+
+        if node.else_case:
+            expr, should_return_null = node.else_case
+            self.compile_branch(expr, should_return_null, keep)
+        elif keep:
+            self.emit(LOAD_NULL)
+
+        for index in end_jumps:
+            self.patch(index, len(self.code))
+
+    def compile_branch(self, expr, should_return_null, keep):
+        """Compile an if/elif/else branch, which yields NULL for block bodies."""
+        if should_return_null:
+            self.compile(expr, False)
+            if keep:
+                self.emit(LOAD_NULL)
+        else:
+            self.compile(expr, keep)
+
+    def compile_WhileNode(self, node, keep):
+        collect = keep and not node.should_return_null
+        setup = self.emit(SETUP_LOOP)
+        head = len(self.code)
+
+        self.compile(node.condition_node)
+        exit_jump = self.emit(JUMP_IF_FALSE)
+        self.compile_loop_body(node.body_node, collect)
+        self.emit(JUMP, head)
+
+        end = len(self.code)
+        self.patch(exit_jump, end)
+        self.patch(setup, (head, end))
+        self.emit_end_loop(node, keep)
+
+    def compile_ForNode(self, node, keep):
+        collect = keep and not node.should_return_null
+        self.compile(node.start_value_node)
+        self.compile(node.end_value_node)
+        if node.step_value_node:
+            self.compile(node.step_value_node)
+        setup = self.emit(FOR_SETUP)
+        head = self.emit(FOR_ITER, node.var_name_tok.value)
+
+        self.compile_loop_body(node.body_node, collect)
+        self.emit(JUMP, head)
+
+        end = len(self.code)
+        self.patch(setup, (node.step_value_node is not None, head, end))
+        self.emit_end_loop(node, keep)
+
+    def compile_loop_body(self, body_node, collect):
+        self.loop_depth += 1
+        self.compile(body_node, collect)
+        if collect:
+            self.emit(LOOP_APPEND)
+        self.loop_depth -= 1
+
+    def emit_end_loop(self, node, keep):
+        if not keep:
+            self.emit(END_LOOP, LOOP_DISCARD, node)
+        elif node.should_return_null:
+            self.emit(END_LOOP, LOOP_NULL, node)
+        else:
+            self.emit(END_LOOP, LOOP_LIST, node)
+
+    def compile_CallNode(self, node, keep):
+        self.compile(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.compile(arg_node)
+        self.emit(CALL, len(node.arg_nodes), node)
+        if not keep:
+            self.emit(POP_TOP)
+
+    def compile_ReturnNode(self, node, keep):
+        if node.node_to_return:
+            self.compile(node.node_to_return)
+        else:
+            self.emit(LOAD_NULL)
+        self.emit(RETURN_VALUE, None, node)
+
+    def compile_ContinueNode(self, node, keep):
+        # Outside a compiled loop the signal has to leave the function, so let
+        # the interpreter produce it.
+        if not self.loop_depth:
+            self.compile_fallback(node, keep)
+            return
+        self.emit(CONTINUE_LOOP, None, node)
+
+    def compile_BreakNode(self, node, keep):
+        if not self.loop_depth:
+            self.compile_fallback(node, keep)
+            return
+        self.emit(BREAK_LOOP, None, node)
+
+
+COMPILED_NODES = tuple(
+    name[len("compile_") :]
+    for name in vars(Compiler)
+    if name.startswith("compile_") and name[len("compile_") :].endswith("Node")
+)
+
+_code_cache = WeakKeyDictionary()
+
+_EXHAUSTED = object()
+
+
+def compile_function(body_node, keep):
+    """Compile a function body, caching the result per body node.
+
+    Returns None when the body itself is not a node the compiler lowers, in which case
+    the function should be evaluated by the tree-walking interpreter.
+    """
+    code = _code_cache.get(body_node)
+    if code is None:
+        if type(body_node).__name__ not in COMPILED_NODES:
+            return None
+        compiler = Compiler()
+        compiler.compile(body_node, keep)
+        code = [tuple(instruction) for instruction in compiler.code]
+        _code_cache[body_node] = code
+    return code
+
+
+#######################################
+# VIRTUAL MACHINE
+#######################################
+
+
+def run(code, interpreter, context):
+    """Execute compiled code in the given context.
+
+    Returns the value 'interpreter.visit' would have produced for the original body
+    node, and raises the same RTException, RTReturn, RTBreak or RTContinue.
+    """
+    stack = []
+    # Each active loop pushes [stack_height, continue_pc, break_pc, elements]; FOR loops
+    # also carry their counter iterator and the small int cache to draw counters from
+    blocks = []
+    symbol_table = context.symbol_table
+    symbols = symbol_table.symbols
+    pc = 0
+    code_len = len(code)
+
+    while True:
+        try:
+            while pc < code_len:
+                op, arg, node = code[pc]
+                pc += 1
+
+                if op == LOAD_VAR:
+                    value = symbol_table.get(arg)
+                    if not value:
+                        # Let the interpreter raise the "not defined" error
+                        interpreter.visit(node, context)
+                    stack.append(
+                        value.positioned(node.pos_start, node.pos_end, context)
+                    )
+
+                elif op == LOAD_NUMBER:
+                    stack.append(
+                        Number(arg)
+                        .set_context(context)
+                        .set_pos(node.pos_start, node.pos_end)
+                    )
+
+                elif op == BINARY_OP:
+                    right = stack.pop()
+                    left = stack.pop()
+                    result, error = getattr(left, arg)(right)
+                    if error:
+                        raise RTException(error)
+                    stack.append(result.set_pos(node.pos_start, node.pos_end))
+
+                elif op == JUMP_IF_FALSE:
+                    if not stack.pop().is_true():
+                        pc = arg
+
+                elif op == JUMP:
+                    pc = arg
+
+                elif op == STORE_VAR:
+                    symbol_table.set(arg, stack[-1])
+
+                elif op == POP_TOP:
+                    stack.pop()
+
+                elif op == FOR_ITER:
+                    block = blocks[-1]
+                    i = next(block[4], _EXHAUSTED)
+                    if i is _EXHAUSTED:
+                        pc = block[2]
+                    else:
+                        symbols[arg] = block[5].get(i) or Number(i)
+
+                elif op == CALL:
+                    if arg:
+                        args = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        args = []
+                    value_to_call = (
+                        stack.pop().copy().set_pos(node.pos_start, node.pos_end)
+                    )
+                    value = value_to_call.execute(args).unwrap()
+                    stack.append(
+                        value.positioned(node.pos_start, node.pos_end, context)
+                    )
+
+                elif op == LOAD_STRING:
+                    stack.append(
+                        String(arg)
+                        .set_context(context)
+                        .set_pos(node.pos_start, node.pos_end)
+                    )
+
+                elif op == LOAD_NULL:
+                    stack.append(Number.null)
+
+                elif op == UNARY_OP:
+                    number = stack.pop()
+                    error = None
+                    if arg == "neg":
+                        number, error = number.multed_by(Number.minus_one)
+                    elif arg == "not":
+                        number, error = number.notted()
+                    if error:
+                        raise RTException(error)
+                    stack.append(number.set_pos(node.pos_start, node.pos_end))
+
+                elif op == BUILD_LIST:
+                    if arg:
+                        elements = stack[-arg:]
+                        del stack[-arg:]
+                    else:
+                        elements = []
+                    stack.append(
+                        List(elements)
+                        .set_context(context)
+                        .set_pos(node.pos_start, node.pos_end)
+                    )
+
+                elif op == LOOP_APPEND:
+                    blocks[-1][3].append(stack.pop())
+
+                elif op == SETUP_LOOP:
+                    continue_pc, break_pc = arg
+                    blocks.append([len(stack), continue_pc, break_pc, []])
+
+                elif op == FOR_SETUP:
+                    has_step, continue_pc, break_pc = arg
+                    step_value = stack.pop() if has_step else Number.small_ints[1]
+                    end_value = stack.pop()
+                    start_value = stack.pop()
+                    values = loop_range(
+                        start_value.value, end_value.value, step_value.value
+                    )
+                    small_ints = Number.small_ints if type(values) is range else {}
+                    blocks.append(
+                        [
+                            len(stack),
+                            continue_pc,
+                            break_pc,
+                            [],
+                            iter(values),
+                            small_ints,
+                        ]
+                    )
+
+                elif op == END_LOOP:
+                    block = blocks.pop()
+                    if arg == LOOP_LIST:
+                        stack.append(
+                            List(block[3])
+                            .set_context(context)
+                            .set_pos(node.pos_start, node.pos_end)
+                        )
+                    elif arg == LOOP_NULL:
+                        stack.append(Number.null)
+
+                elif op == BREAK_LOOP:
+                    block = blocks[-1]
+                    del stack[block[0] :]
+                    pc = block[2]
+
+                elif op == CONTINUE_LOOP:
+                    block = blocks[-1]
+                    del stack[block[0] :]
+                    pc = block[1]
+
+                elif op == RETURN_VALUE:
+                    raise RTReturn(stack.pop())
+
+                elif op == EVAL:
+                    stack.append(interpreter.visit(arg, context))
+            return stack.pop() if stack else None
+        except (RTBreak, RTContinue) as signal:
+            # A BREAK or CONTINUE raised by a call or an evaluated node ends or
+            # advances the innermost loop, or leaves this body when there is none
+            if not blocks:
+                raise
+            block = blocks[-1]
+            del stack[block[0] :]
+            pc = block[2] if type(signal) is RTBreak else block[1]
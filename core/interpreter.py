@@ -1,7 +1,33 @@
-from core.nodes import VarAccessNode
+import threading
+
+from core.nodes import (
+    BinOpNode,
+    BreakNode,
+    CallNode,
+    ContinueNode,
+    ForNode,
+    FuncDefNode,
+    IfNode,
+    ListNode,
+    NumberNode,
+    ReturnNode,
+    StringNode,
+    UnaryOpNode,
+    VarAccessNode,
+    VarAssignNode,
+    WhileNode,
+)
+from core.ai_nodes import AICallNode, EmbedNode, PipeNode
 from functions.basefun import BaseFunction
 from utils.errors import RTError
-from execution.runtime import RTResult
+from execution.runtime import (
+    RTBreak,
+    RTContinue,
+    RTException,
+    RTResult,
+    RTReturn,
+    loop_range,
+)
 from core.values import List, Number, String
 from utils.constants import (
     TT_DIV,
@@ -18,23 +44,44 @@ from utils.constants import (
     TT_POW,
 )
 from core.ai_runtime import AIManager, EmbeddingManager
+from core.compiler import compile_function, run
+from core.codegen_py import compile_native
 
 
 class Interpreter:
     def __init__(self):
-        self.ai_manager = AIManager()
-        self.embedding_manager = EmbeddingManager()
+        self.ai_manager = AIManager.instance()
+        self.embedding_manager = EmbeddingManager.instance()
+        self._dispatch = {
+            NumberNode: self.visit_NumberNode,
+            StringNode: self.visit_StringNode,
+            ListNode: self.visit_ListNode,
+            VarAccessNode: self.visit_VarAccessNode,
+            VarAssignNode: self.visit_VarAssignNode,
+            BinOpNode: self.visit_BinOpNode,
+            UnaryOpNode: self.visit_UnaryOpNode,
+            IfNode: self.visit_IfNode,
+            ForNode: self.visit_ForNode,
+            WhileNode: self.visit_WhileNode,
+            FuncDefNode: self.visit_FuncDefNode,
+            CallNode: self.visit_CallNode,
+            ReturnNode: self.visit_ReturnNode,
+            ContinueNode: self.visit_ContinueNode,
+            BreakNode: self.visit_BreakNode,
+            EmbedNode: self.visit_EmbedNode,
+            AICallNode: self.visit_AICallNode,
+            PipeNode: self.visit_PipeNode,
+        }
 
     def visit(self, node, context):
         """
         Dispatch the appropriate visitor method for a given AST node.
 
-        Determines the method name dynamically based on the node's class
-        (e.g., 'visit_NumberNode') and invokes that method with the node
-        and execution context.
+        Looks up the bound visitor method (e.g., 'visit_NumberNode') for the
+        node's class in the dispatch table built in '__init__' and invokes it
+        with the node and execution context.
         """
-        method_name = f"visit_{type(node).__name__}"
-        method = getattr(self, method_name, self.no_visit_method)
+        method = self._dispatch.get(type(node), self.no_visit_method)
         return method(node, context)
 
     def no_visit_method(self, node, context):
@@ -49,16 +96,16 @@ class Interpreter:
     ###################################
 
     def visit_NumberNode(self, node, context):
-        """Visit a number literal node and return its numeric value wrapped in an RTResult."""
-        return RTResult().success(
+        """Visit a number literal node and return its numeric value."""
+        return (
             Number(node.tok.value)
             .set_context(context)
             .set_pos(node.pos_start, node.pos_end)
         )
 
     def visit_StringNode(self, node, context):
-        """Visit a string literal node and return its string value wrapped in an RTResult."""
-        return RTResult().success(
+        """Visit a string literal node and return its string value."""
+        return (
             String(node.tok.value)
             .set_context(context)
             .set_pos(node.pos_start, node.pos_end)
@@ -70,26 +117,17 @@ class Interpreter:
         Iterates over each element node in the list, evaluates them, and collects the resulting values.
         Returns a List value with the evaluated elements, setting its context and positional info.
         """
-        res = RTResult()
-        elements = []
-
-        for element_node in node.element_nodes:
-            elements.append(res.register(self.visit(element_node, context)))
-            if res.should_return():
-                return res
-
-        return res.success(
-            List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
-        )
+        visit = self.visit
+        elements = [visit(element_node, context) for element_node in node.element_nodes]
+        return List(elements).set_context(context).set_pos(node.pos_start, node.pos_end)
 
     def visit_VarAccessNode(self, node, context):
         """Visit a variable access node, retrieve the variable's value from the symbol table, and return it."""
-        res = RTResult()
         var_name = node.var_name_tok.value
         value = context.symbol_table.get(var_name)
 
         if not value:
-            return res.failure(
+            raise RTException(
                 RTError(
                     node.pos_start,
                     node.pos_end,
@@ -98,29 +136,18 @@ class Interpreter:
                 )
             )
 
-        value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-        return res.success(value)
+        return value.positioned(node.pos_start, node.pos_end, context)
 
     def visit_VarAssignNode(self, node, context):
         """Visit a variable assignment node, evaluate the assigned expression, and update the symbol table."""
-        res = RTResult()
-        var_name = node.var_name_tok.value
-        value = res.register(self.visit(node.value_node, context))
-        if res.should_return():
-            return res
-
-        context.symbol_table.set(var_name, value)
-        return res.success(value)
+        value = self.visit(node.value_node, context)
+        context.symbol_table.set(node.var_name_tok.value, value)
+        return value
 
     def visit_BinOpNode(self, node, context):
         """Visit a binary operation node, evaluate both operands, and perform the operation."""
-        res = RTResult()
-        left = res.register(self.visit(node.left_node, context))
-        if res.should_return():
-            return res
-        right = res.register(self.visit(node.right_node, context))
-        if res.should_return():
-            return res
+        left = self.visit(node.left_node, context)
+        right = self.visit(node.right_node, context)
 
         if node.op_tok.type == TT_PLUS:
             result, error = left.added_to(right)
@@ -150,29 +177,24 @@ class Interpreter:
             result, error = left.ored_by(right)
 
         if error:
-            return res.failure(error)
-        else:
-            return res.success(result.set_pos(node.pos_start, node.pos_end))
+            raise RTException(error)
+        return result.set_pos(node.pos_start, node.pos_end)
 
     def visit_UnaryOpNode(self, node, context):
         """Visit a unary operation node, evaluate its operand
         (such as minus (negation) or logical NOT), and apply the unary operator."""
-        res = RTResult()
-        number = res.register(self.visit(node.node, context))
-        if res.should_return():
-            return res
+        number = self.visit(node.node, context)
 
         error = None
 
         if node.op_tok.type == TT_MINUS:
-            number, error = number.multed_by(Number(-1))
+            number, error = number.multed_by(Number.minus_one)
         elif node.op_tok.matches(TT_KEYWORD, "NOT"):
             number, error = number.notted()
 
         if error:
-            return res.failure(error)
-        else:
-            return res.success(number.set_pos(node.pos_start, node.pos_end))
+            raise RTException(error)
+        return number.set_pos(node.pos_start, node.pos_end)
 
     def visit_IfNode(self, node, context):
         """Visit an if-statement node and execute the corresponding branch.
@@ -181,27 +203,17 @@ class Interpreter:
         corresponding expression (or statement block) is evaluated and returned. If no conditions are true,
         the else branch (if present) is evaluated.
         """
-        res = RTResult()
-
         for condition, expr, should_return_null in node.cases:
-            condition_value = res.register(self.visit(condition, context))
-            if res.should_return():
-                return res
-
-            if condition_value.is_true():
-                expr_value = res.register(self.visit(expr, context))
-                if res.should_return():
-                    return res
-                return res.success(Number.null if should_return_null else expr_value)
+            if self.visit(condition, context).is_true():
+                expr_value = self.visit(expr, context)
+                return Number.null if should_return_null else expr_value
 
         if node.else_case:
             expr, should_return_null = node.else_case
-            expr_value = res.register(self.visit(expr, context))
-            if res.should_return():
-                return res
-            return res.success(Number.null if should_return_null else expr_value)
+            expr_value = self.visit(expr, context)
+            return Number.null if should_return_null else expr_value
 
-        return res.success(Number.null)
+        return Number.null
 
     def visit_ForNode(self, node, context):
         """Visit a for-loop node, iterating over a range of values and evaluating the loop body.
@@ -210,52 +222,37 @@ class Interpreter:
         For each iteration, assigns the current value to the loop variable and evaluates the body.
         Accumulates the results (if required) and handles control flow (continue/break).
         """
-        res = RTResult()
         elements = []
 
-        start_value = res.register(self.visit(node.start_value_node, context))
-        if res.should_return():
-            return res
-
-        end_value = res.register(self.visit(node.end_value_node, context))
-        if res.should_return():
-            return res
-
+        start_value = self.visit(node.start_value_node, context)
+        end_value = self.visit(node.end_value_node, context)
         if node.step_value_node:
-            step_value = res.register(self.visit(node.step_value_node, context))
-            if res.should_return():
-                return res
+            step_value = self.visit(node.step_value_node, context)
         else:
-            step_value = Number(1)
-
-        i = start_value.value
+            step_value = Number.small_ints[1]
 
-        if step_value.value >= 0:
-            condition = lambda: i < end_value.value
-        else:
-            condition = lambda: i > end_value.value
-
-        while condition():
-            context.symbol_table.set(node.var_name_tok.value, Number(i))
-            i += step_value.value
+        # The bounds, loop variable slot and body are fixed for the whole loop
+        var_name = node.var_name_tok.value
+        symbols = context.symbol_table.symbols
+        body_node = node.body_node
+        visit = self.visit
+        counters = loop_range(start_value.value, end_value.value, step_value.value)
+        # Integer counters reuse the shared small Numbers; variable access copies them
+        small_ints = Number.small_ints if type(counters) is range else {}
 
-            value = res.register(self.visit(node.body_node, context))
-            if (
-                res.should_return()
-                and res.loop_should_continue == False
-                and res.loop_should_break == False
-            ):
-                return res
+        for i in counters:
+            symbols[var_name] = small_ints.get(i) or Number(i)
 
-            if res.loop_should_continue:
+            try:
+                value = visit(body_node, context)
+            except RTContinue:
                 continue
-
-            if res.loop_should_break:
+            except RTBreak:
                 break
 
             elements.append(value)
 
-        return res.success(
+        return (
             Number.null
             if node.should_return_null
             else List(elements)
@@ -270,34 +267,22 @@ class Interpreter:
         results if applicable, and handles control flow signals (continue/break). When the condition becomes false,
         returns the accumulated results.
         """
-        res = RTResult()
         elements = []
+        condition_node = node.condition_node
+        body_node = node.body_node
+        visit = self.visit
 
-        while True:
-            condition = res.register(self.visit(node.condition_node, context))
-            if res.should_return():
-                return res
-
-            if not condition.is_true():
-                break
-
-            value = res.register(self.visit(node.body_node, context))
-            if (
-                res.should_return()
-                and res.loop_should_continue == False
-                and res.loop_should_break == False
-            ):
-                return res
-
-            if res.loop_should_continue:
+        while visit(condition_node, context).is_true():
+            try:
+                value = visit(body_node, context)
+            except RTContinue:
                 continue
-
-            if res.loop_should_break:
+            except RTBreak:
                 break
 
             elements.append(value)
 
-        return res.success(
+        return (
             Number.null
             if node.should_return_null
             else List(elements)
@@ -312,8 +297,6 @@ class Interpreter:
         Creates a Function object with these attributes, sets its context and position, and registers it
         in the symbol table if it has a name.
         """
-        res = RTResult()
-
         func_name = node.var_name_tok.value if node.var_name_tok else None
         body_node = node.body_node
         arg_names = [arg_name.value for arg_name in node.arg_name_toks]
@@ -326,7 +309,7 @@ class Interpreter:
         if node.var_name_tok:
             context.symbol_table.set(func_name, func_value)
 
-        return res.success(func_value)
+        return func_value
 
     def visit_CallNode(self, node, context):
         """Visit a function call node, evaluate the callable and its arguments, and execute the function.
@@ -335,81 +318,69 @@ class Interpreter:
         Executes the function with the evaluated arguments in a new execution context,
         and returns the function's result.
         """
-        res = RTResult()
-        args = []
-
-        value_to_call = res.register(self.visit(node.node_to_call, context))
-        if res.should_return():
-            return res
+        value_to_call = self.visit(node.node_to_call, context)
         value_to_call = value_to_call.copy().set_pos(node.pos_start, node.pos_end)
 
-        for arg_node in node.arg_nodes:
-            args.append(res.register(self.visit(arg_node, context)))
-            if res.should_return():
-                return res
+        visit = self.visit
+        args = [visit(arg_node, context) for arg_node in node.arg_nodes]
 
-        return_value = res.register(value_to_call.execute(args))
-        if res.should_return():
-            return res
-        return_value = (
-            return_value.copy()
-            .set_pos(node.pos_start, node.pos_end)
-            .set_context(context)
-        )
-        return res.success(return_value)
+        return_value = value_to_call.execute(args).unwrap()
+        return return_value.positioned(node.pos_start, node.pos_end, context)
 
     def visit_ReturnNode(self, node, context):
         """Visit a return node and signal a function return.
 
-        Evaluates the expression (if any) following the return keyword, and wraps it in an RTResult
-        that indicates a function return.
+        Evaluates the expression (if any) following the return keyword, and raises it in an
+        RTReturn for the enclosing function call to catch.
         """
-        res = RTResult()
-
         if node.node_to_return:
-            value = res.register(self.visit(node.node_to_return, context))
-            if res.should_return():
-                return res
+            value = self.visit(node.node_to_return, context)
         else:
             value = Number.null
 
-        return res.success_return(value)
+        raise RTReturn(value)
 
     def visit_ContinueNode(self, node, context):
         """Visit a continue node and signal that the current loop should continue to its next iteration."""
-        return RTResult().success_continue()
+        raise RTContinue()
 
     def visit_BreakNode(self, node, context):
         """Visit a break node and signal that the current loop should be exited."""
-        return RTResult().success_break()
+        raise RTBreak()
 
     def visit_EmbedNode(self, node, context):
         """Visit an embedding node and generate embeddings for the text."""
-        res = RTResult()
-        
-        text = res.register(self.visit(node.text_node, context))
-        if res.should_return():
-            return res
+        text = self.visit(node.text_node, context)
             
-        if not isinstance(text, String):
-            return res.failure(RTError(
+        if isinstance(text, String):
+            texts = None
+        elif isinstance(text, List) and all(isinstance(x, String) for x in text.elements):
+            texts = [x.value for x in text.elements]
+        else:
+            raise RTException(RTError(
                 node.pos_start, node.pos_end,
-                "First argument must be a string",
+                "First argument must be a string or a list of strings",
                 context
             ))
             
         model_name = 'default'
         if node.model_node:
-            model = res.register(self.visit(node.model_node, context))
-            if res.should_return():
-                return res
+            model = self.visit(node.model_node, context)
             model_name = model.value
             
         try:
-            embedding = self.embedding_manager.embed(text.value, model_name)
-            return res.success(embedding)
+            if texts is None:
+                embedding = self.embedding_manager.embed(text.value, model_name)
+                return embedding.set_context(context).set_pos(node.pos_start, node.pos_end)
+
+            # A list of texts is encoded in one batched model call
+            embeddings = [
+                embedding.set_context(context).set_pos(node.pos_start, node.pos_end)
+                for embedding in self.embedding_manager.embed_batch(texts, model_name)
+            ]
+            return List(embeddings).set_context(context).set_pos(node.pos_start, node.pos_end)
         except Exception as e:
-            return res.failure(RTError(
+            raise RTException(RTError(
                 node.pos_start, node.pos_end,
                 f"Error generating embedding: {str(e)}",
                 context
@@ -417,14 +388,11 @@ class Interpreter:
 
     def visit_AICallNode(self, node, context):
         """Visit an AI call node and execute the model with given arguments."""
-        res = RTResult()
-        
         args = []
         for arg_node in node.args:
-            arg = res.register(self.visit(arg_node, context))
-            if res.should_return():
-                return res
-            args.append(arg.value)
+            arg = self.visit(arg_node, context)
+            # Numbers and strings are passed as Python values, lists and embeddings as is
+            args.append(arg.value if isinstance(arg, (Number, String)) else arg)
             
         result, error = self.ai_manager.call_model(
             node.model_name.value,
@@ -435,22 +403,18 @@ class Interpreter:
         )
         
         if error:
-            return res.failure(error)
-        return res.success(result)
+            raise RTException(error)
+        return result
 
     def visit_PipeNode(self, node, context):
         """Visit a pipe node and chain operations."""
-        res = RTResult()
-        
-        left = res.register(self.visit(node.left_node, context))
-        if res.should_return():
-            return res
+        left = self.visit(node.left_node, context)
             
         if isinstance(node.right_node, VarAccessNode):
             # Handle function reference
             func = context.symbol_table.get(node.right_node.var_name_tok.value)
             if not isinstance(func, BaseFunction):
-                return res.failure(RTError(
+                raise RTException(RTError(
                     node.right_node.pos_start,
                     node.right_node.pos_end,
                     "Expected a function",
@@ -459,16 +423,25 @@ class Interpreter:
             args = [left]
         else:
             # Handle direct function
-            func = res.register(self.visit(node.right_node, context))
-            if res.should_return():
-                return res
+            func = self.visit(node.right_node, context)
             args = [left]
             
-        result = res.register(func.execute(args))
-        if res.should_return():
-            return res
-            
-        return res.success(result)
+        return func.execute(args).unwrap()
+
+
+_local = threading.local()
+
+
+def shared_interpreter():
+    """Return this thread's Interpreter, creating it on first use.
+
+    An Interpreter keeps no per-run state, so function calls reuse one instead of
+    building a new one, with its dispatch table, on every call.
+    """
+    interpreter = getattr(_local, "interpreter", None)
+    if interpreter is None:
+        interpreter = _local.interpreter = Interpreter()
+    return interpreter
 
 
 class Function(BaseFunction):
@@ -481,6 +454,8 @@ class Function(BaseFunction):
         self.body_node = body_node
         self.arg_names = arg_names
         self.should_auto_return = should_auto_return
+        self.code = compile_function(body_node, should_auto_return)
+        self.native = compile_native(body_node, arg_names, should_auto_return)
 
     def execute(self, args):
         """Execute the function with the provided arguments.
@@ -488,28 +463,51 @@ class Function(BaseFunction):
         This method performs the following steps:
           1. Creates a new execution context for the function.
           2. Checks and populates the arguments into the context.
-          3. Uses an Interpreter instance to visit and evaluate the function body.
-          4. Determines the return value based on the auto-return flag, the interpreter's return value,
-             or defaults to Number.null.
+          3. Runs the compiled body on the stack VM, or uses the thread's shared Interpreter
+             to visit and evaluate the body if it could not be compiled.
+          4. Determines the return value based on the auto-return flag, a RETURN raised
+             from the body, or defaults to Number.null.
+
+        Purely numeric bodies called with numbers skip all of this and run natively.
         """
-        res = RTResult()
-        interpreter = Interpreter()
+        if self.native is not None and len(args) == len(self.arg_names):
+            if all(type(arg) is Number for arg in args):
+                try:
+                    value = self.native([arg.value for arg in args])
+                except Exception:
+                    # Let the interpreter produce the error
+                    pass
+                else:
+                    return RTResult.new().success(
+                        Number.null if value is None else Number(value)
+                    )
+
+        res = RTResult.new()
+        interpreter = shared_interpreter()
         exec_ctx = self.generate_new_context()
 
-        res.register(self.check_and_populate_args(self.arg_names, args, exec_ctx))
-        if res.should_return():
-            return res
-
-        value = res.register(interpreter.visit(self.body_node, exec_ctx))
-        if res.should_return() and res.func_return_value == None:
-            return res
+        error = self.check_and_populate_args(self.arg_names, args, exec_ctx)
+        if error:
+            return res.failure(error)
 
-        ret_value = (
-            (value if self.should_auto_return else None)
-            or res.func_return_value
-            or Number.null
-        )
-        return res.success(ret_value)
+        try:
+            if self.code is not None:
+                value = run(self.code, interpreter, exec_ctx)
+            else:
+                value = interpreter.visit(self.body_node, exec_ctx)
+            if not self.should_auto_return:
+                value = None
+        except RTReturn as signal:
+            value = signal.value
+        except RTException as e:
+            return res.failure(e.error)
+        except RTBreak:
+            # Loop signals outside a loop reach the caller's loop
+            return res.success_break()
+        except RTContinue:
+            return res.success_continue()
+
+        return res.success(value or Number.null)
 
     def copy(self):
         """Create a copy of the function instance."""
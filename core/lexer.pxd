@@ -0,0 +1,26 @@
+# Cython declarations for lexer.py (pure Python mode).
+# Only used when the module is compiled, e.g. `cythonize -i -3 core/lexer.py`.
+
+cdef class Token:
+    cdef public object type
+    cdef public object value
+    cdef public object pos_start
+    cdef public object pos_end
+
+
+cdef class Position:
+    cdef public Py_ssize_t idx
+    cdef public Py_ssize_t ln
+    cdef public Py_ssize_t col
+    cdef public object fn
+    cdef public object ftxt
+
+
+cdef class Lexer:
+    cdef public object fn
+    cdef public object text
+    cdef public Py_ssize_t text_len
+    cdef public object buf
+    cdef public Position pos
+    cdef public object current_byte
+    cdef public object error
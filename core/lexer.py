@@ -1,10 +1,38 @@
+import gc
+import re
+import sys
+
+import numpy as np
+
+from core._lex_numba import (
+    C_BANG,
+    C_COMMENT,
+    C_DIGIT,
+    C_EQUALS,
+    C_GREATER,
+    C_LESS,
+    C_LETTER,
+    C_MINUS,
+    C_NEWLINE,
+    C_QUOTE,
+    C_SINGLE,
+    C_WHITESPACE,
+    CHAR_CLASSES,
+    ESCAPES,
+    K_FLOAT,
+    K_IDENTIFIER,
+    K_INT,
+    K_KEYWORD,
+    K_STRING,
+    KEYWORD_BUCKETS,
+    KEYWORD_SPELLINGS,
+    SCAN_OK,
+    SINGLE_CHAR_KINDS,
+    scan,
+)
 from utils.errors import ExpectedCharError, IllegalCharError
 from utils.constants import (
-    DIGITS,
-    KEYWORDS,
-    LETTERS,
-    LETTERS_DIGITS,
-    NUM_CHARS,
+    KEYWORD_SET,
     TT_ARROW,
     TT_COMMA,
     TT_DIV,
@@ -23,6 +51,7 @@ from utils.constants import (
     TT_LTE,
     TT_MINUS,
     TT_MUL,
+    TT_NAMES,
     TT_NE,
     TT_NEWLINE,
     TT_PLUS,
@@ -33,11 +62,116 @@ from utils.constants import (
     WHITESPACE,
 )
 
+# Digits with at most one decimal point, as long as the lexer reads them
+NUMBER_PATTERN = re.compile(r"[0-9]+(\.[0-9]*)?")
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+WHITESPACE_PATTERN = re.compile("[" + re.escape("".join(sorted(WHITESPACE))) + "]+")
+ESCAPE_CHARACTERS = {"n": "\n", "t": "\t", '"': '"'}
+
+# Sources shorter than this are not worth a call into the compiled scanner
+NATIVE_SCAN_MIN_LENGTH = 10000
+
+# Token type for each kind code the compiled scanner emits
+KIND_TYPES = [
+    TT_INT,
+    TT_FLOAT,
+    TT_STRING,
+    TT_IDENTIFIER,
+    TT_NEWLINE,
+    TT_PLUS,
+    TT_MINUS,
+    TT_ARROW,
+    TT_MUL,
+    TT_DIV,
+    TT_POW,
+    TT_LPAREN,
+    TT_RPAREN,
+    TT_LSQUARE,
+    TT_RSQUARE,
+    TT_COMMA,
+    TT_EQ,
+    TT_EE,
+    TT_NE,
+    TT_LT,
+    TT_LTE,
+    TT_GT,
+    TT_GTE,
+    TT_KEYWORD,
+]
+
+
+def read_string(text, idx):
+    """Read a string literal's contents from idx, just after its opening quote.
+
+    Runs of plain characters are copied with one slice, up to the next quote or
+    backslash found by 'str.find'. Returns the string and the index of the closing
+    quote, or the length of the text if there is none.
+    """
+    text_len = len(text)
+    parts = []
+
+    while idx < text_len:
+        end = text.find('"', idx)
+        if end == -1:
+            end = text_len
+        backslash = text.find("\\", idx, end)
+        if backslash == -1:
+            parts.append(text[idx:end])
+            idx = end
+            break
+        parts.append(text[idx:backslash])
+        idx = backslash + 1
+        if idx < text_len:
+            char = text[idx]
+            parts.append(ESCAPE_CHARACTERS.get(char, char))
+            idx += 1
+
+    return "".join(parts), idx
+
+
+# Token type and interned spelling of the identifiers lexed so far, by spelling
+_identifiers = {}
+MAX_IDENTIFIERS = 4096
+
+
+def identifier_entry(id_str):
+    """Return the token type and interned spelling of a name, remembering it while
+    fewer than MAX_IDENTIFIERS names are remembered."""
+    # Interned names are shared by every token and symbol table key that uses them
+    id_str = sys.intern(id_str)
+    # The hash of an interned str is cached, so one set probe is the cheapest test
+    entry = (TT_KEYWORD if id_str in KEYWORD_SET else TT_IDENTIFIER, id_str)
+    if len(_identifiers) < MAX_IDENTIFIERS:
+        _identifiers[id_str] = entry
+    return entry
+
+
+# Character codes the lexer compares the current character against
+NEWLINE = ord("\n")
+EQUALS = ord("=")
+GREATER = ord(">")
+
+# Code units of the same width as str characters, so buffer and text indexes agree
+UTF32 = "utf-32-le" if sys.byteorder == "little" else "utf-32-be"
+
+
+def code_points(text):
+    """Return the text as a sequence of int character codes.
+
+    ASCII text becomes bytes. Other text is encoded as UTF-32 and read through a
+    memoryview, since UTF-8 would shift every index after a multi-byte character.
+    """
+    if text.isascii():
+        return text.encode("ascii")
+    return memoryview(text.encode(UTF32, "surrogatepass")).cast("I")
+
 
 class Token:
     """Represents a token in the source code.
     It contains its type, value, and positional information."""
 
+    __slots__ = ("type", "value", "pos_start", "pos_end")
+
     def __init__(self, type_, value=None, pos_start=None, pos_end=None):
         """Initialize a new Token instance."""
         self.type = type_
@@ -45,8 +179,8 @@ class Token:
 
         if pos_start:
             self.pos_start = pos_start.copy()
-            self.pos_end = pos_start.copy()
-            self.pos_end.advance()
+            if not pos_end:
+                self.pos_end = pos_start.copy().advance()
 
         if pos_end:
             self.pos_end = pos_end.copy()
@@ -58,13 +192,15 @@ class Token:
     def __repr__(self):
         """Return the string representation of the token."""
         if self.value:
-            return f"{self.type}:{self.value}"
-        return f"{self.type}"
+            return f"{TT_NAMES[self.type]}:{self.value}"
+        return f"{TT_NAMES[self.type]}"
 
 
 class Position:
     """Represents a specific location in the source code."""
 
+    __slots__ = ("idx", "ln", "col", "fn", "ftxt")
+
     def __init__(self, idx, ln, col, fn, ftxt):
         self.idx = idx
         self.ln = ln
@@ -91,213 +227,430 @@ class Position:
 class Lexer:
     """A lexical analyzer (lexer) for converting source code into a list of tokens."""
 
+    __slots__ = ("fn", "text", "text_len", "buf", "pos", "current_byte", "error")
+
     def __init__(self, fn, text):
         """Initialize the lexer with a filename and source text"""
         self.fn = fn
         self.text = text
+        # The buffer holds one code per character, so it has the text's length too
+        self.text_len = len(text)
+        self.buf = code_points(text)
         self.pos = Position(-1, 0, -1, fn, text)
-        self.current_char = None
+        self.current_byte = None
+        self.error = None
         self.advance()
 
     def advance(self):
         """Advance the lexer's position by one character, updating the current character."""
-        self.pos.advance(self.current_char)
-        self.current_char = (
-            self.text[self.pos.idx] if self.pos.idx < len(self.text) else None
-        )
+        pos = self.pos
+        pos.idx += 1
+        pos.col += 1
+        if self.current_byte == NEWLINE:
+            pos.ln += 1
+            pos.col = 0
+        self.current_byte = self.buf[pos.idx] if pos.idx < self.text_len else None
+
+    def token_from(self, tok_type, value, start):
+        """Return a token spanning from start, an (idx, ln, col) snapshot, to the current position.
+
+        Snapshots are plain tuples; each end becomes a Position only here, once.
+        """
+        pos = self.pos
+        token = Token(tok_type, value)
+        token.pos_start = Position(start[0], start[1], start[2], self.fn, self.text)
+        token.pos_end = Position(pos.idx, pos.ln, pos.col, self.fn, self.text)
+        return token
+
+    def token_here(self, tok_type):
+        """Return a token one character wide at the current position."""
+        pos = self.pos
+        token = Token(tok_type)
+        token.pos_start = Position(pos.idx, pos.ln, pos.col, self.fn, self.text)
+        token.pos_end = Position(pos.idx + 1, pos.ln, pos.col + 1, self.fn, self.text)
+        return token
 
     def make_tokens(self):
         """Process the entire source text and convert it into a list of tokens."""
-        tokens = []
+        if (
+            scan is not None
+            and self.text_len >= NATIVE_SCAN_MIN_LENGTH
+            and self.text.isascii()
+        ):
+            tokens = self.make_tokens_native()
+            if tokens is not None:
+                return tokens, None
 
-        while self.current_char is not None:
-            if self.current_char in WHITESPACE:
-                self.advance()
-            elif self.current_char == "#":
-                self.skip_comment()
-            elif self.current_char in ";\n":
-                tokens.append(Token(TT_NEWLINE, pos_start=self.pos))
-                self.advance()
-            elif self.current_char in DIGITS:
-                tokens.append(self.make_number())
-            elif self.current_char in LETTERS:
-                tokens.append(self.make_identifier())
-            elif self.current_char == '"':
-                tokens.append(self.make_string())
-            elif self.current_char == "+":
-                tokens.append(Token(TT_PLUS, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "-":
-                tokens.append(self.make_minus_or_arrow())
-            elif self.current_char == "*":
-                tokens.append(Token(TT_MUL, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "/":
-                tokens.append(Token(TT_DIV, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "^":
-                tokens.append(Token(TT_POW, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "(":
-                tokens.append(Token(TT_LPAREN, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == ")":
-                tokens.append(Token(TT_RPAREN, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "[":
-                tokens.append(Token(TT_LSQUARE, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "]":
-                tokens.append(Token(TT_RSQUARE, pos_start=self.pos))
-                self.advance()
-            elif self.current_char == "!":
-                token, error = self.make_not_equals()
-                if error:
-                    return [], error
-                tokens.append(token)
-            elif self.current_char == "=":
-                tokens.append(self.make_equals())
-            elif self.current_char == "<":
-                tokens.append(self.make_less_than())
-            elif self.current_char == ">":
-                tokens.append(self.make_greater_than())
-            elif self.current_char == ",":
-                tokens.append(Token(TT_COMMA, pos_start=self.pos))
-                self.advance()
-            else:
-                pos_start = self.pos.copy()
-                char = self.current_char
-                self.advance()
-                return [], IllegalCharError(pos_start, self.pos, "'" + char + "'")
-
-        tokens.append(Token(TT_EOF, pos_start=self.pos))
+        tokens = list(self.iter_tokens())
+        if self.error:
+            return [], self.error
         return tokens, None
 
-    def make_number(self):
-        """Parse a number (integer or float) from the source text."""
-        num_str = ""
-        dot_count = 0
-        pos_start = self.pos.copy()
+    def iter_tokens(self):
+        """Yield the tokens of the source text one at a time, as they are lexed.
+
+        A parser pulling from this generator overlaps lexing with parsing instead of
+        waiting for the whole list. The tokens always end with an EOF token; when the
+        text has an error, they stop at it, and 'error' holds it once the generator
+        is exhausted.
+        """
+        if (
+            scan is not None
+            and self.text_len >= NATIVE_SCAN_MIN_LENGTH
+            and self.text.isascii()
+        ):
+            tokens = self.make_tokens_native()
+            if tokens is not None:
+                yield from tokens.to_list()
+                return
 
-        while self.current_char is not None and self.current_char in NUM_CHARS:
-            if self.current_char == ".":
-                if dot_count == 1:
-                    break
-                dot_count += 1
-            num_str += self.current_char
-            self.advance()
+        tokens = []
+        dispatch = DISPATCH
+        lex_illegal_char = Lexer.lex_illegal_char
+
+        while self.current_byte is not None:
+            code = self.current_byte
+            handler = dispatch[code] if code < 256 else lex_illegal_char
+            error = handler(self, tokens)
+            if error:
+                self.error = error
+                break
+            if tokens:
+                yield tokens.pop()
+
+        yield self.token_here(TT_EOF)
+
+    def make_tokens_native(self):
+        """Tokenize the whole text with the compiled scanner.
+
+        Returns a TokenStream over the scanner's token table, or None when the source
+        has an error, so that 'make_tokens' reports it exactly as before.
+        """
+        data = self.text.encode("ascii")
+        padded = data + bytes(-len(data) % 8)
+        records, count, strings, status, idx, ln, col = scan(
+            np.frombuffer(padded, dtype=np.uint8)[: len(data)],
+            np.frombuffer(padded, dtype=np.uint64),
+            CHAR_CLASSES,
+            ESCAPES,
+            KEYWORD_BUCKETS,
+            KEYWORD_SPELLINGS,
+        )
+        if status != SCAN_OK:
+            return None
 
-        if dot_count == 0:
-            return Token(TT_INT, int(num_str), pos_start, self.pos)
-        else:
-            return Token(TT_FLOAT, float(num_str), pos_start, self.pos)
+        self.pos = Position(idx, ln, col, self.fn, self.text)
+        self.current_byte = None
+        return TokenStream(
+            self.fn, self.text, records[:, :count], strings.tobytes(), self.pos
+        )
 
-    def make_string(self):
-        """Parse a string litteral from the source text."""
-        string = ""
-        pos_start = self.pos.copy()
-        escape_character = False
-        self.advance()
+    ###################################
+    # Handlers for the first character of a token, looked up in DISPATCH. Each one
+    # consumes a token and appends it to tokens, or returns an error.
 
-        escape_characters = {"n": "\n", "t": "\t", '"': '"'}
+    def lex_whitespace(self, tokens):
+        # A run of spaces and tabs never crosses a line, so only the column moves
+        pos = self.pos
+        end = WHITESPACE_PATTERN.match(self.text, pos.idx).end()
+        pos.col += end - pos.idx
+        pos.idx = end
+        self.current_byte = self.buf[end] if end < self.text_len else None
 
-        while self.current_char is not None and (
-            self.current_char != '"' or escape_character
-        ):
-            if escape_character:
-                string += escape_characters.get(self.current_char, self.current_char)
-            else:
-                if self.current_char == "\\":
-                    escape_character = True
-                    self.advance()
-                    continue
-                else:
-                    string += self.current_char
-            self.advance()
-            escape_character = False
+    def lex_comment(self, tokens):
+        self.skip_comment()
 
-        self.advance()
-        return Token(TT_STRING, string, pos_start, self.pos)
+    def lex_newline(self, tokens):
+        # Only reached for '\n'; ';' is dispatched as a single character token
+        tokens.append(self.token_here(TT_NEWLINE))
+        pos = self.pos
+        pos.ln += 1
+        pos.col = 0
+        pos.idx += 1
+        self.current_byte = self.buf[pos.idx] if pos.idx < self.text_len else None
 
-    def make_identifier(self):
-        """Parse an identifier or keyword from the source text."""
-        id_str = ""
-        pos_start = self.pos.copy()
+    def lex_number(self, tokens):
+        tokens.append(self.make_number())
 
-        while (
-            self.current_char is not None and self.current_char in LETTERS_DIGITS + "_"
-        ):
-            id_str += self.current_char
-            self.advance()
+    def lex_identifier(self, tokens):
+        tokens.append(self.make_identifier())
 
-        tok_type = TT_KEYWORD if id_str in KEYWORDS else TT_IDENTIFIER
-        return Token(tok_type, id_str, pos_start, self.pos)
+    def lex_string(self, tokens):
+        tokens.append(self.make_string())
 
-    def make_minus_or_arrow(self):
-        """Distinguish between a minus operator and an arrow token ('->')."""
-        tok_type = TT_MINUS
+    def lex_minus_or_arrow(self, tokens):
+        tokens.append(self.make_minus_or_arrow())
+
+    def lex_not_equals(self, tokens):
+        token, error = self.make_not_equals()
+        if error:
+            return error
+        tokens.append(token)
+
+    def lex_equals(self, tokens):
+        tokens.append(self.make_equals())
+
+    def lex_less_than(self, tokens):
+        tokens.append(self.make_less_than())
+
+    def lex_greater_than(self, tokens):
+        tokens.append(self.make_greater_than())
+
+    def lex_illegal_char(self, tokens):
         pos_start = self.pos.copy()
+        char = chr(self.current_byte)
         self.advance()
+        return IllegalCharError(pos_start, self.pos, "'" + char + "'")
+
+    ###################################
+
+    def advance_to(self, idx):
+        """Advance the lexer's position to idx in one step, as repeated 'advance' calls would."""
+        text = self.text
+        pos = self.pos
+        newlines = text.count("\n", pos.idx, idx)
+        if newlines:
+            pos.ln += newlines
+            pos.col = idx - text.rindex("\n", pos.idx, idx) - 1
+        else:
+            pos.col += idx - pos.idx
+        pos.idx = idx
+        self.current_byte = self.buf[idx] if idx < self.text_len else None
+
+    def make_number(self):
+        """Parse a number (integer or float) from the source text."""
+        pos = self.pos
+        start = (pos.idx, pos.ln, pos.col)
+        match = NUMBER_PATTERN.match(self.text, pos.idx)
+        num_str = match.group()
+        self.advance_to(match.end())
+
+        if match.lastindex is None:
+            return self.token_from(TT_INT, int(num_str), start)
+        else:
+            return self.token_from(TT_FLOAT, float(num_str), start)
 
-        if self.current_char == ">":
-            self.advance()
-            tok_type = TT_ARROW
+    def make_string(self):
+        """Parse a string litteral from the source text."""
+        pos = self.pos
+        start = (pos.idx, pos.ln, pos.col)
+        string, idx = read_string(self.text, pos.idx + 1)
+        # Past the closing quote, or one past the end when the string is unterminated
+        self.advance_to(idx + 1)
+        return self.token_from(TT_STRING, string, start)
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+    def make_identifier(self):
+        """Parse an identifier or keyword from the source text."""
+        pos = self.pos
+        start = (pos.idx, pos.ln, pos.col)
+        match = IDENTIFIER_PATTERN.match(self.text, pos.idx)
+        id_str = match.group()
+        self.advance_to(match.end())
+
+        # Programs reuse a few names many times, so their type and interned
+        # spelling come from one lookup after the first time
+        try:
+            tok_type, id_str = _identifiers[id_str]
+        except KeyError:
+            tok_type, id_str = identifier_entry(id_str)
+        return self.token_from(tok_type, id_str, start)
+
+    def make_minus_or_arrow(self):
+        """Distinguish between a minus operator and an arrow token ('->')."""
+        return self.make_operator(TT_MINUS, GREATER, TT_ARROW)
 
     def make_not_equals(self):
         """Parse the '!=' operator."""
-        pos_start = self.pos.copy()
-        self.advance()
+        pos = self.pos
+        start = (pos.idx, pos.ln, pos.col)
+        idx = pos.idx + 1
 
-        if self.current_char == "=":
-            self.advance()
-            return Token(TT_NE, pos_start=pos_start, pos_end=self.pos), None
+        if idx < self.text_len and self.buf[idx] == EQUALS:
+            pos.idx = idx + 1
+            pos.col += 2
+            self.current_byte = self.buf[idx + 1] if idx + 1 < self.text_len else None
+            return self.token_from(TT_NE, None, start), None
 
         self.advance()
-        return None, ExpectedCharError(pos_start, self.pos, "'=' (after '!')")
+        self.advance()
+        return None, ExpectedCharError(
+            Position(*start, self.fn, self.text), self.pos, "'=' (after '!')"
+        )
 
     def make_equals(self):
         """Parse the '=' and/or '==' operator."""
-        tok_type = TT_EQ
-        pos_start = self.pos.copy()
-        self.advance()
-
-        if self.current_char == "=":
-            self.advance()
-            tok_type = TT_EE
-
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        return self.make_operator(TT_EQ, EQUALS, TT_EE)
 
     def make_less_than(self):
         """Parse the '<' and/or '<=' operator."""
-        tok_type = TT_LT
-        pos_start = self.pos.copy()
-        self.advance()
-
-        if self.current_char == "=":
-            self.advance()
-            tok_type = TT_LTE
-
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        return self.make_operator(TT_LT, EQUALS, TT_LTE)
 
     def make_greater_than(self):
         """Parse the '>' and/or '>=' operator."""
-        tok_type = TT_GT
-        pos_start = self.pos.copy()
-        self.advance()
+        return self.make_operator(TT_GT, EQUALS, TT_GTE)
+
+    def make_operator(self, tok_type, second, pair_type):
+        """Parse a one character operator, or the two character one it starts when the
+        next character is second. Neither contains a newline, so only idx and col move.
+        """
+        pos = self.pos
+        start = (pos.idx, pos.ln, pos.col)
+        buf = self.buf
+        text_len = self.text_len
+        idx = pos.idx + 1
+
+        if idx < text_len and buf[idx] == second:
+            idx += 1
+            tok_type = pair_type
+
+        pos.col += idx - pos.idx
+        pos.idx = idx
+        self.current_byte = buf[idx] if idx < text_len else None
+        return self.token_from(tok_type, None, start)
 
-        if self.current_char == "=":
-            self.advance()
-            tok_type = TT_GTE
+    def skip_comment(self):
+        """Skip over a comment in the source text, up to and including its newline.
 
-        return Token(tok_type, pos_start=pos_start, pos_end=self.pos)
+        A comment on the last line runs to the end of the text.
+        """
+        newline = self.text.find("\n", self.pos.idx)
+        self.advance_to(self.text_len if newline == -1 else newline + 1)
 
-    def skip_comment(self):
-        """Skip over a comment in the source text."""
-        self.advance()
 
-        while self.current_char != "\n":
-            self.advance()
+class TokenStream:
+    """The tokens of a source kept as parallel columns, built into Tokens on access.
 
-        self.advance()
+    'columns' is the compiled scanner's (FIELDS, n) table: the kind code and the start
+    and end index, line and column of every token, each field stored contiguously.
+    String values are sliced from 'strings', where the scanner stored them with their
+    escapes decoded, other values from the text; both are sliced and Token objects
+    created the first time the parser reads an index, so a source costs one small
+    int per field until then.
+    Indexing, len() and iteration behave like the list 'make_tokens' returns,
+    including the EOF token at the end; 'to_list' turns it into that list.
+    """
+
+    def __init__(self, fn, text, columns, strings, eof_pos):
+        self.fn = fn
+        self.text = text
+        self.columns = columns
+        self.strings = strings
+        (
+            self.kinds,
+            self.start_idx,
+            self.start_ln,
+            self.start_col,
+            self.end_idx,
+            self.end_ln,
+            self.end_col,
+            self.value_start,
+            self.value_end,
+        ) = columns.tolist()
+        self.eof_pos = eof_pos
+        self.tokens = [None] * (len(self.kinds) + 1)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def __getitem__(self, idx):
+        token = self.tokens[idx]
+        if token is None:
+            if idx < 0:
+                idx += len(self.tokens)
+            token = self.tokens[idx] = self.make_token(idx)
+        return token
+
+    def __iter__(self):
+        for idx in range(len(self.tokens)):
+            yield self[idx]
+
+    def to_list(self):
+        """Return every Token as a list, building the missing ones in one pass.
+
+        A parser steps back and forth over the tokens many times, so it reads them
+        from a plain list rather than through '__getitem__'.
+        """
+        tokens = self.tokens
+        # Tokens hold no reference cycles; collecting while building hundreds of
+        # thousands of them would cost more than building them
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for idx, token in enumerate(tokens):
+                if token is None:
+                    tokens[idx] = self.make_token(idx)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return list(tokens)
+
+    def make_token(self, idx):
+        """Build the Token at idx from its columns."""
+        if idx == len(self.kinds):
+            return Token(TT_EOF, pos_start=self.eof_pos)
+
+        kind = self.kinds[idx]
+        start = self.start_idx[idx]
+        end = self.end_idx[idx]
+        tok_type = KIND_TYPES[kind]
+        if kind == K_IDENTIFIER or kind == K_KEYWORD:
+            # The scanner has already told keywords apart
+            value = sys.intern(self.text[start:end])
+        elif kind == K_INT:
+            value = int(self.text[start:end])
+        elif kind == K_FLOAT:
+            value = float(self.text[start:end])
+        elif kind == K_STRING:
+            value = self.strings[self.value_start[idx] : self.value_end[idx]].decode(
+                "ascii"
+            )
+        else:
+            value = None
+
+        # The positions are fresh, so they are set without Token's defensive copies
+        token = Token(tok_type, value)
+        token.pos_start = Position(
+            start, self.start_ln[idx], self.start_col[idx], self.fn, self.text
+        )
+        token.pos_end = Position(
+            end, self.end_ln[idx], self.end_col[idx], self.fn, self.text
+        )
+        return token
+
+
+def single_char_handler(tok_type):
+    """Return a handler for a token made of one character."""
+
+    def lex_single_char(self, tokens):
+        tokens.append(self.token_here(tok_type))
+        # Never a newline, so the line stays the same
+        pos = self.pos
+        pos.idx += 1
+        pos.col += 1
+        self.current_byte = self.buf[pos.idx] if pos.idx < self.text_len else None
+
+    return lex_single_char
+
+
+# The handler for each character class, and through it for each character code below
+# 256; other characters are illegal
+HANDLERS = [Lexer.lex_illegal_char] * (C_SINGLE + len(KIND_TYPES))
+HANDLERS[C_WHITESPACE] = Lexer.lex_whitespace
+HANDLERS[C_DIGIT] = Lexer.lex_number
+HANDLERS[C_LETTER] = Lexer.lex_identifier
+HANDLERS[C_QUOTE] = Lexer.lex_string
+HANDLERS[C_COMMENT] = Lexer.lex_comment
+HANDLERS[C_NEWLINE] = Lexer.lex_newline
+HANDLERS[C_MINUS] = Lexer.lex_minus_or_arrow
+HANDLERS[C_BANG] = Lexer.lex_not_equals
+HANDLERS[C_EQUALS] = Lexer.lex_equals
+HANDLERS[C_LESS] = Lexer.lex_less_than
+HANDLERS[C_GREATER] = Lexer.lex_greater_than
+for kind in SINGLE_CHAR_KINDS.values():
+    HANDLERS[C_SINGLE + kind] = single_char_handler(KIND_TYPES[kind])
+
+# Classes resolved ahead of time, so the lexer loop does a single lookup per character
+DISPATCH = [HANDLERS[char_class] for char_class in CHAR_CLASSES.tolist()]
+# ';' ends a statement like '\n' but stays on its line, so it gets its own handler
+# rather than lex_newline testing which of the two it is
+DISPATCH[ord(";")] = single_char_handler(TT_NEWLINE)
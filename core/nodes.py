@@ -2,8 +2,13 @@
 # NODES
 #######################################
 
+# Nodes declare their attributes in __slots__; the __weakref__ slot lets function
+# bodies be keys of the compiled code caches
+
 
 class NumberNode:
+    __slots__ = ("tok", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, tok):
         self.tok = tok
 
@@ -15,6 +20,8 @@ class NumberNode:
 
 
 class StringNode:
+    __slots__ = ("tok", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, tok):
         self.tok = tok
 
@@ -26,6 +33,8 @@ class StringNode:
 
 
 class ListNode:
+    __slots__ = ("element_nodes", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, element_nodes, pos_start, pos_end):
         self.element_nodes = element_nodes
 
@@ -34,6 +43,8 @@ class ListNode:
 
 
 class VarAccessNode:
+    __slots__ = ("var_name_tok", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, var_name_tok):
         self.var_name_tok = var_name_tok
 
@@ -42,6 +53,8 @@ class VarAccessNode:
 
 
 class VarAssignNode:
+    __slots__ = ("var_name_tok", "value_node", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, var_name_tok, value_node):
         self.var_name_tok = var_name_tok
         self.value_node = value_node
@@ -51,6 +64,15 @@ class VarAssignNode:
 
 
 class BinOpNode:
+    __slots__ = (
+        "left_node",
+        "op_tok",
+        "right_node",
+        "pos_start",
+        "pos_end",
+        "__weakref__",
+    )
+
     def __init__(self, left_node, op_tok, right_node):
         self.left_node = left_node
         self.op_tok = op_tok
@@ -64,6 +86,8 @@ class BinOpNode:
 
 
 class UnaryOpNode:
+    __slots__ = ("op_tok", "node", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, op_tok, node):
         self.op_tok = op_tok
         self.node = node
@@ -76,6 +100,8 @@ class UnaryOpNode:
 
 
 class IfNode:
+    __slots__ = ("cases", "else_case", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, cases, else_case):
         self.cases = cases
         self.else_case = else_case
@@ -85,6 +111,18 @@ class IfNode:
 
 
 class ForNode:
+    __slots__ = (
+        "var_name_tok",
+        "start_value_node",
+        "end_value_node",
+        "step_value_node",
+        "body_node",
+        "should_return_null",
+        "pos_start",
+        "pos_end",
+        "__weakref__",
+    )
+
     def __init__(
         self,
         var_name_tok,
@@ -106,6 +144,15 @@ class ForNode:
 
 
 class WhileNode:
+    __slots__ = (
+        "condition_node",
+        "body_node",
+        "should_return_null",
+        "pos_start",
+        "pos_end",
+        "__weakref__",
+    )
+
     def __init__(self, condition_node, body_node, should_return_null):
         self.condition_node = condition_node
         self.body_node = body_node
@@ -116,6 +163,16 @@ class WhileNode:
 
 
 class FuncDefNode:
+    __slots__ = (
+        "var_name_tok",
+        "arg_name_toks",
+        "body_node",
+        "should_auto_return",
+        "pos_start",
+        "pos_end",
+        "__weakref__",
+    )
+
     def __init__(self, var_name_tok, arg_name_toks, body_node, should_auto_return):
         self.var_name_tok = var_name_tok
         self.arg_name_toks = arg_name_toks
@@ -133,6 +190,8 @@ class FuncDefNode:
 
 
 class CallNode:
+    __slots__ = ("node_to_call", "arg_nodes", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, node_to_call, arg_nodes):
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
@@ -146,6 +205,8 @@ class CallNode:
 
 
 class ReturnNode:
+    __slots__ = ("node_to_return", "pos_start", "pos_end", "__weakref__")
+
     def __init__(self, node_to_return, pos_start, pos_end):
         self.node_to_return = node_to_return
 
@@ -154,12 +215,16 @@ class ReturnNode:
 
 
 class ContinueNode:
+    __slots__ = ("pos_start", "pos_end", "__weakref__")
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
 
 
 class BreakNode:
+    __slots__ = ("pos_start", "pos_end", "__weakref__")
+
     def __init__(self, pos_start, pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
@@ -0,0 +1,16 @@
+# Cython declarations for parser.py (pure Python mode).
+# Only used when the module is compiled, e.g. `cythonize -i -3 core/parser.py`.
+
+cdef class ParseResult:
+    cdef public object error
+    cdef public object node
+    cdef public Py_ssize_t last_registered_advance_count
+    cdef public Py_ssize_t advance_count
+    cdef public Py_ssize_t to_reverse_count
+
+
+cdef class Parser:
+    cdef public list tokens
+    cdef public Py_ssize_t tok_idx
+    cdef public object current_tok
+    cdef public object pending
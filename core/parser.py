@@ -1,4 +1,7 @@
+import sys
+
 from utils.errors import InvalidSyntaxError
+from core.lexer import TokenStream
 from core.nodes import (
     BinOpNode,
     BreakNode,
@@ -50,41 +53,73 @@ from utils.constants import (
 )
 
 
+# Results released by ParseResult.register, handed out again by ParseResult.new
+_free_results = []
+MAX_FREE_RESULTS = 256
+
+
 class ParseResult:
     """Represents the result of a parsing operation.
 
     Attributes:
-        error (Error or None): The error encountered during parsing, if any.
+        error (tuple or None): The position and details of the syntax error encountered
+            during parsing, if any; Parser.parse returns it as an InvalidSyntaxError.
         node (AST Node or None): The AST node produced by successful parsing.
         last_registered_advance_count (int): The advancement count from the last registration.
         advance_count (int): Total number of tokens advanced during parsing.
         to_reverse_count (int): The number of tokens to reverse (backtrack) when an error occurs.
     """
 
+    __slots__ = (
+        "error",
+        "node",
+        "last_registered_advance_count",
+        "advance_count",
+        "to_reverse_count",
+    )
+
     def __init__(self):
         """Initialize a new ParseResult instance with no node and no error."""
+        self.reset()
+
+    @staticmethod
+    def new():
+        """Return a reset ParseResult, reusing a released one when available.
+
+        Every nonterminal creates a result that lives only until its caller registers
+        it, as RTResult.new does for execute() results.
+        """
+        try:
+            res = _free_results.pop()
+        except IndexError:
+            return ParseResult()
+        res.reset()
+        return res
+
+    def reset(self):
+        """Reset the result to no node, no error and no advancement."""
         self.error = None
         self.node = None
         self.last_registered_advance_count = 0
         self.advance_count = 0
         self.to_reverse_count = 0
 
-    def register_advancement(self):
-        """Record an advancement in the token index."""
-        self.last_registered_advance_count = 1
-        self.advance_count += 1
-
     def register(self, res):
         """Register the result from a sub-parsing operation.
 
         This method updates the advance count based on the provided ParseResult (res). If the sub-result
         contains an error, it is propagated. Finally, it returns the node from the sub-result.
+        The registered result must not be used afterwards: it is released for reuse by
+        ParseResult.new.
         """
         self.last_registered_advance_count = res.advance_count
         self.advance_count += res.advance_count
         if res.error:
             self.error = res.error
-        return res.node
+        node = res.node
+        if len(_free_results) < MAX_FREE_RESULTS:
+            _free_results.append(res)
+        return node
 
     def try_register(self, res):
         """
@@ -96,6 +131,8 @@ class ParseResult:
         """
         if res.error:
             self.to_reverse_count = res.advance_count
+            if len(_free_results) < MAX_FREE_RESULTS:
+                _free_results.append(res)
             return None
         return self.register(res)
 
@@ -104,14 +141,16 @@ class ParseResult:
         self.node = node
         return self
 
-    def failure(self, error):
-        """Mark the parsing as failed with a provided error.
+    def failure(self, pos_start, pos_end, details):
+        """Mark the parsing as failed with a syntax error at the given positions.
 
         If no error was previously recorded or if no tokens were advanced since the last successful operation,
-        the error is updated.
+        the error is updated. It is kept as a (pos_start, pos_end, details) tuple: most
+        failures are backtracked or replaced by a caller's, so Parser.parse only builds
+        the InvalidSyntaxError for the one that is reported.
         """
         if not self.error or self.last_registered_advance_count == 0:
-            self.error = error
+            self.error = (pos_start, pos_end, details)
         return self
 
 
@@ -119,10 +158,51 @@ class ParseResult:
 # PARSER
 #######################################
 
+# Keyword spellings, interned like the values of keyword tokens so that they can be
+# compared by identity
+KW_VAR = sys.intern("VAR")
+KW_IF = sys.intern("IF")
+KW_ELIF = sys.intern("ELIF")
+KW_ELSE = sys.intern("ELSE")
+KW_THEN = sys.intern("THEN")
+KW_FOR = sys.intern("FOR")
+KW_TO = sys.intern("TO")
+KW_STEP = sys.intern("STEP")
+KW_WHILE = sys.intern("WHILE")
+KW_FUN = sys.intern("FUN")
+KW_END = sys.intern("END")
+KW_NOT = sys.intern("NOT")
+KW_PIPE = sys.intern("PIPE")
+KW_EMBED = sys.intern("EMBED")
+KW_WITH = sys.intern("WITH")
+KW_AI = sys.intern("AI")
+
+# Keywords that end a block of statements; a statement never starts with one
+BLOCK_END_KEYWORDS = frozenset(("END", "ELSE", "ELIF"))
+
+# The node for each single token operand, by token type
+OPERAND_NODES = {
+    TT_INT: NumberNode,
+    TT_FLOAT: NumberNode,
+    TT_STRING: StringNode,
+    TT_IDENTIFIER: VarAccessNode,
+}
+# Tokens that cannot continue an expression after an operand; any keyword but these
+# operators cannot either
+EXPRESSION_ENDS = frozenset((TT_NEWLINE, TT_EOF, TT_RPAREN, TT_RSQUARE, TT_COMMA))
+OPERATOR_KEYWORDS = frozenset(("AND", "OR", "PIPE"))
+
 
 class Parser:
     def __init__(self, tokens):
-        """Initialize the parser with a list of tokens."""
+        """Initialize the parser with a list of tokens, a lexer's TokenStream, or an
+        iterator such as 'Lexer.iter_tokens', which is read as the parser advances."""
+        self.pending = None
+        if isinstance(tokens, TokenStream):
+            tokens = tokens.to_list()
+        elif not isinstance(tokens, list):
+            self.pending = iter(tokens)
+            tokens = []
         self.tokens = tokens
         self.tok_idx = -1
         self.advance()
@@ -133,6 +213,20 @@ class Parser:
         self.update_current_tok()
         return self.current_tok
 
+    def consume(self, res):
+        """Advance past the current token and record the advancement on res.
+
+        The advancement is recorded on res directly rather than through a method,
+        as this is the parser's most common step.
+        """
+        res.last_registered_advance_count = 1
+        res.advance_count += 1
+        self.tok_idx += 1
+        try:
+            self.current_tok = self.tokens[self.tok_idx]
+        except IndexError:
+            self.update_current_tok()
+
     def reverse(self, amount=1):
         """Reverse the token index by a specified amount."""
         self.tok_idx -= amount
@@ -140,210 +234,293 @@ class Parser:
         return self.current_tok
 
     def update_current_tok(self):
-        """Update the current token based on the current token index."""
-        if self.tok_idx >= 0 and self.tok_idx < len(self.tokens):
+        """Update the current token based on the current token index.
+
+        The tokens end with an EOF token, which no rule consumes, so the index stays
+        within them; only tokens still to be read from an iterator can be missing.
+        """
+        try:
             self.current_tok = self.tokens[self.tok_idx]
+        except IndexError:
+            self.read_pending_tokens(self.tok_idx)
+            if self.tok_idx < len(self.tokens):
+                self.current_tok = self.tokens[self.tok_idx]
+
+    def read_pending_tokens(self, idx):
+        """Read tokens from the iterator the parser was given until there is one at idx,
+        or the iterator is exhausted."""
+        if self.pending is not None:
+            # Tokens read so far are kept, since the parser may backtrack over them
+            for token in self.pending:
+                self.tokens.append(token)
+                if len(self.tokens) > idx:
+                    break
+            else:
+                self.pending = None
+
+    def peek(self):
+        """Return the token after the current one without advancing, or None."""
+        idx = self.tok_idx + 1
+        if idx >= len(self.tokens):
+            self.read_pending_tokens(idx)
+            if idx >= len(self.tokens):
+                return None
+        return self.tokens[idx]
 
     def parse(self):
         """Parse the list of tokens to generate the Abstract Syntax Tree (AST)."""
+        tok = self.current_tok
+        if tok.type in OPERAND_NODES:
+            # A program that is a single literal or name, as typed at the shell,
+            # needs none of the grammar
+            next_tok = self.peek()
+            if next_tok is not None and next_tok.type == TT_EOF:
+                res = ParseResult.new()
+                self.consume(res)
+                node = OPERAND_NODES[tok.type](tok)
+                return res.success(ListNode([node], tok.pos_start, next_tok.pos_end))
+
         res = self.statements()
         if not res.error and self.current_tok.type != TT_EOF:
-            return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "Token cannot appear after previous tokens",
-                )
+            res.failure(
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                "Token cannot appear after previous tokens",
             )
+        if res.error:
+            res.error = InvalidSyntaxError(*res.error)
         return res
 
     def statements(self):
         """Parse multiple statements, handling newlines as statement separators."""
-        res = ParseResult()
+        res = ParseResult.new()
         statements = []
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
         while self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
         statement = res.register(self.statement())
         if res.error:
             return res
         statements.append(statement)
 
-        more_statements = True
-
-        while True:
-            newline_count = 0
+        while self.current_tok.type == TT_NEWLINE:
+            self.consume(res)
             while self.current_tok.type == TT_NEWLINE:
-                res.register_advancement()
-                self.advance()
-                newline_count += 1
-            if newline_count == 0:
-                more_statements = False
-
-            if not more_statements:
+                self.consume(res)
+
+            tok = self.current_tok
+            if tok.type == TT_EOF or (
+                tok.type == TT_KEYWORD and tok.value in BLOCK_END_KEYWORDS
+            ):
+                # No statement starts here, so skip the attempt that would fail and be
+                # backtracked at the end of every block
                 break
             statement = res.try_register(self.statement())
             if not statement:
                 self.reverse(res.to_reverse_count)
-                more_statements = False
-                continue
+                break
             statements.append(statement)
 
-        return res.success(
-            ListNode(statements, pos_start, self.current_tok.pos_end.copy())
-        )
+        return res.success(ListNode(statements, pos_start, self.current_tok.pos_end))
 
     def statement(self):
-        """Parse a single statement, which could be a return, continue, break, or an expression."""
-        res = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
-
-        if self.current_tok.matches(TT_KEYWORD, "RETURN"):
-            res.register_advancement()
-            self.advance()
-
-            expr = res.try_register(self.expr())
-            if not expr:
-                self.reverse(res.to_reverse_count)
-            return res.success(
-                ReturnNode(expr, pos_start, self.current_tok.pos_start.copy())
-            )
+        """Parse a single statement, which could be a return, continue, break, or an expression.
 
-        if self.current_tok.matches(TT_KEYWORD, "CONTINUE"):
-            res.register_advancement()
-            self.advance()
-            return res.success(
-                ContinueNode(pos_start, self.current_tok.pos_start.copy())
-            )
-
-        if self.current_tok.matches(TT_KEYWORD, "BREAK"):
-            res.register_advancement()
-            self.advance()
-            return res.success(BreakNode(pos_start, self.current_tok.pos_start.copy()))
+        Statements starting with a keyword are parsed by the method looked up in
+        KEYWORD_STATEMENT_PARSERS; any other statement is an expression.
+        """
+        tok = self.current_tok
+        if tok.type == TT_KEYWORD:
+            parse_statement = KEYWORD_STATEMENT_PARSERS.get(tok.value)
+            if parse_statement is not None:
+                return parse_statement(self)
 
+        res = ParseResult.new()
         expr = res.register(self.expr())
         if res.error:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "Expected 'RETURN', 'CONTINUE', 'BREAK', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                "Expected 'RETURN', 'CONTINUE', 'BREAK', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
             )
         return res.success(expr)
 
+    def return_statement(self):
+        """Parse a 'RETURN' statement, with or without a value."""
+        res = ParseResult.new()
+        pos_start = self.current_tok.pos_start
+        self.consume(res)
+
+        expr = res.try_register(self.expr())
+        if not expr:
+            self.reverse(res.to_reverse_count)
+        return res.success(ReturnNode(expr, pos_start, self.current_tok.pos_start))
+
+    def continue_statement(self):
+        """Parse a 'CONTINUE' statement."""
+        res = ParseResult.new()
+        pos_start = self.current_tok.pos_start
+        self.consume(res)
+        return res.success(ContinueNode(pos_start, self.current_tok.pos_start))
+
+    def break_statement(self):
+        """Parse a 'BREAK' statement."""
+        res = ParseResult.new()
+        pos_start = self.current_tok.pos_start
+        self.consume(res)
+        return res.success(BreakNode(pos_start, self.current_tok.pos_start))
+
     def expr(self):
         """Parse an expression, including pipeline operations."""
-        res = ParseResult()
+        res = ParseResult.new()
+        tok = self.current_tok
+
+        if tok.type in OPERAND_NODES:
+            # Most expressions are a lone literal or name. When nothing that follows
+            # can continue it, build its node without descending through every
+            # precedence level to 'atom', which would return the same node
+            next_tok = self.peek()
+            if next_tok is not None and (
+                next_tok.type in EXPRESSION_ENDS
+                or (
+                    next_tok.type == TT_KEYWORD
+                    and next_tok.value not in OPERATOR_KEYWORDS
+                )
+            ):
+                self.consume(res)
+                return res.success(OPERAND_NODES[tok.type](tok))
 
-        if self.current_tok.matches(TT_KEYWORD, "VAR"):
-            res.register_advancement()
-            self.advance()
+        if tok.type == TT_KEYWORD and tok.value is KW_VAR:
+            self.consume(res)
 
             if self.current_tok.type != TT_IDENTIFIER:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Expected identifier",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    "Expected identifier",
                 )
 
             var_name = self.current_tok
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
             if self.current_tok.type != TT_EQ:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Expected '='",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    "Expected '='",
                 )
 
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
             expr = res.register(self.expr())
             if res.error:
                 return res
             return res.success(VarAssignNode(var_name, expr))
 
-        node = res.register(self.bin_op(self.comp_expr, ((TT_KEYWORD, "AND"), (TT_KEYWORD, "OR"))))
+        node = res.register(self.binary_expr(PREC_LOGIC))
         if res.error:
             return res
 
         # Handle pipeline operations
-        while self.current_tok.matches(TT_KEYWORD, "PIPE"):
-            res.register_advancement()
-            self.advance()
+        tok = self.current_tok
+        while tok.type == TT_KEYWORD and tok.value is KW_PIPE:
+            self.consume(res)
 
             right = res.register(self.atom())
             if res.error:
                 return res
 
             node = PipeNode(node, right)
+            tok = self.current_tok
 
         return res.success(node)
 
-    def comp_expr(self):
-        """Parse a comparison expression, handling unary 'NOT' or binary comparison operators."""
-        res = ParseResult()
+    def binary_expr(self, min_prec):
+        """Parse operands joined by binary operators binding at least as tightly as
+        min_prec, by precedence climbing over BINARY_OPERATORS.
 
-        if self.current_tok.matches(TT_KEYWORD, "NOT"):
-            op_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
+        Operands at PREC_NOT or below are comparisons, which may be negated with 'NOT';
+        tighter operands are factors.
+        """
+        res = ParseResult.new()
+        if min_prec <= PREC_NOT:
+            left = res.register(self.comp_expr())
+        else:
+            left = res.register(self.factor())
+        if res.error:
+            return res
+
+        op_tok = self.current_tok
+        while True:
+            op_type = op_tok.type
+            if op_type == TT_KEYWORD:
+                operator = KEYWORD_BINARY_OPERATORS.get(op_tok.value)
+            else:
+                operator = BINARY_OPERATORS.get(op_type)
+            if operator is None:
+                break
+            prec, right_prec = operator
+            if prec < min_prec:
+                break
 
-            node = res.register(self.comp_expr())
+            self.consume(res)
+            right = res.register(self.binary_expr(right_prec))
             if res.error:
                 return res
-            return res.success(UnaryOpNode(op_tok, node))
+            left = BinOpNode(left, op_tok, right)
+            op_tok = self.current_tok
 
-        node = res.register(
-            self.bin_op(self.arith_expr, (TT_EE, TT_NE, TT_LT, TT_GT, TT_LTE, TT_GTE))
-        )
+        return res.success(left)
+
+    def comp_expr(self):
+        """Parse a comparison expression, handling unary 'NOT' or binary comparison operators."""
+        res = ParseResult.new()
+
+        # A chain of 'NOT's is collected in a loop, then applied innermost first
+        not_toks = []
+        op_tok = self.current_tok
+        while op_tok.type == TT_KEYWORD and op_tok.value is KW_NOT:
+            not_toks.append(op_tok)
+            self.consume(res)
+            op_tok = self.current_tok
+
+        node = res.register(self.binary_expr(PREC_COMPARISON))
 
         if res.error:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "Expected int, float, identifier, '+', '-', '(', '[', 'IF', 'FOR', 'WHILE', 'FUN' or 'NOT'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                "Expected int, float, identifier, '+', '-', '(', '[', 'IF', 'FOR', 'WHILE', 'FUN' or 'NOT'",
             )
 
+        for op_tok in reversed(not_toks):
+            node = UnaryOpNode(op_tok, node)
         return res.success(node)
 
-    def arith_expr(self):
-        """Parse an arithmetic expression involving addition and subtraction."""
-        return self.bin_op(self.term, (TT_PLUS, TT_MINUS))
-
-    def term(self):
-        """Parse a term in an arithmetic expression, handling multiplication and division."""
-        return self.bin_op(self.factor, (TT_MUL, TT_DIV))
-
     def factor(self):
         """Parse a factor in an arithmetic expression, handling unary plus and minus."""
-        res = ParseResult()
         tok = self.current_tok
-
-        if tok.type in (TT_PLUS, TT_MINUS):
-            res.register_advancement()
-            self.advance()
-            factor = res.register(self.factor())
-            if res.error:
-                return res
-            return res.success(UnaryOpNode(tok, factor))
-
-        return self.power()
-
-    def power(self):
-        """Parse an expression involving the power operator."""
-        return self.bin_op(self.call, (TT_POW,), self.factor)
+        tok_type = tok.type
+        if tok_type != TT_PLUS and tok_type != TT_MINUS:
+            return self.call()
+
+        # A chain of signs is collected in a loop, then applied innermost first to
+        # the power expression that follows
+        res = ParseResult.new()
+        sign_toks = []
+        while tok_type == TT_PLUS or tok_type == TT_MINUS:
+            sign_toks.append(tok)
+            self.consume(res)
+            tok = self.current_tok
+            tok_type = tok.type
+
+        node = res.register(self.binary_expr(PREC_POWER))
+        if res.error:
+            return res
+        for tok in reversed(sign_toks):
+            node = UnaryOpNode(tok, node)
+        return res.success(node)
 
     def call(self):
         """Parse a function call expression.
@@ -351,205 +528,180 @@ class Parser:
         Checks if an atom (primary expression) is followed by parentheses,
         indicating a function call with arguments.
         """
-        res = ParseResult()
-        atom = res.register(self.atom())
-        if res.error:
-            return res
+        res = ParseResult.new()
+        tok = self.current_tok
+        operand_node = OPERAND_NODES.get(tok.type)
+        if operand_node is not None:
+            # Literals and names, most of the atoms, are built here without the
+            # dispatch through 'atom'
+            self.consume(res)
+            atom = operand_node(tok)
+        else:
+            atom = res.register(self.atom())
+            if res.error:
+                return res
 
         if self.current_tok.type == TT_LPAREN:
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
             arg_nodes = []
 
             if self.current_tok.type == TT_RPAREN:
-                res.register_advancement()
-                self.advance()
+                self.consume(res)
             else:
                 arg_nodes.append(res.register(self.expr()))
                 if res.error:
                     return res.failure(
-                        InvalidSyntaxError(
-                            self.current_tok.pos_start,
-                            self.current_tok.pos_end,
-                            "Expected ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
-                        )
+                        self.current_tok.pos_start,
+                        self.current_tok.pos_end,
+                        "Expected ')', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
                     )
 
-                while self.current_tok.type == TT_COMMA:
-                    res.register_advancement()
-                    self.advance()
-
-                    arg_nodes.append(res.register(self.expr()))
-                    if res.error:
-                        return res
+                self.more_exprs(res, arg_nodes, TT_RPAREN)
+                if res.error:
+                    return res
 
                 if self.current_tok.type != TT_RPAREN:
                     return res.failure(
-                        InvalidSyntaxError(
-                            self.current_tok.pos_start,
-                            self.current_tok.pos_end,
-                            f"Expected ',' or ')'",
-                        )
+                        self.current_tok.pos_start,
+                        self.current_tok.pos_end,
+                        f"Expected ',' or ')'",
                     )
 
-                res.register_advancement()
-                self.advance()
+                self.consume(res)
             return res.success(CallNode(atom, arg_nodes))
         return res.success(atom)
 
+    def more_exprs(self, res, nodes, close_type):
+        """Parse the ', expr' items after the first of a comma-separated list closed by
+        a close_type token, appending their nodes to nodes and recording the
+        advancement and any error on res.
+
+        An item that is a lone literal or name, as in most literal lists, is built
+        in place without a ParseResult of its own.
+        """
+        while self.current_tok.type == TT_COMMA:
+            self.consume(res)
+
+            tok = self.current_tok
+            if tok.type in OPERAND_NODES:
+                next_tok = self.peek()
+                if next_tok is not None and (
+                    next_tok.type == TT_COMMA or next_tok.type == close_type
+                ):
+                    self.consume(res)
+                    nodes.append(OPERAND_NODES[tok.type](tok))
+                    continue
+
+            nodes.append(res.register(self.expr()))
+            if res.error:
+                return
+
     def atom(self):
         """Parse an atomic expression.
 
         Handles literals (integers, floats, strings), variable access,
         parenthesized expressions, list expressions, and control constructs (if, for, while, fun).
+        The parsing method is looked up by token type in ATOM_PARSERS, or for keywords by
+        keyword in KEYWORD_ATOM_PARSERS.
         """
-        res = ParseResult()
         tok = self.current_tok
 
-        if tok.type in (TT_INT, TT_FLOAT):
-            res.register_advancement()
-            self.advance()
-            return res.success(NumberNode(tok))
-
-        elif tok.type == TT_STRING:
-            res.register_advancement()
-            self.advance()
-            return res.success(StringNode(tok))
-
-        elif tok.type == TT_IDENTIFIER:
-            res.register_advancement()
-            self.advance()
-            return res.success(VarAccessNode(tok))
-
-        elif tok.matches(TT_KEYWORD, "EMBED"):
-            embed_expr = res.register(self.embed_expr())
-            if res.error:
-                return res
-            return res.success(embed_expr)
-
-        elif tok.matches(TT_KEYWORD, "AI"):
-            ai_expr = res.register(self.ai_expr())
-            if res.error:
-                return res
-            return res.success(ai_expr)
-
-        elif tok.type == TT_LPAREN:
-            res.register_advancement()
-            self.advance()
-            expr = res.register(self.expr())
-            if res.error:
-                return res
-            if self.current_tok.type == TT_RPAREN:
-                res.register_advancement()
-                self.advance()
-                return res.success(expr)
-            else:
-                return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Expected ')'",
-                    )
-                )
-
-        elif tok.type == TT_LSQUARE:
-            list_expr = res.register(self.list_expr())
-            if res.error:
-                return res
-            return res.success(list_expr)
-
-        elif tok.matches(TT_KEYWORD, "IF"):
-            if_expr = res.register(self.if_expr())
-            if res.error:
-                return res
-            return res.success(if_expr)
+        if tok.type == TT_KEYWORD:
+            parse_atom = KEYWORD_ATOM_PARSERS.get(tok.value)
+        else:
+            parse_atom = ATOM_PARSERS.get(tok.type)
+        if parse_atom is not None:
+            return parse_atom(self)
+
+        return ParseResult.new().failure(
+            tok.pos_start,
+            tok.pos_end,
+            "Expected int, float, identifier, '+', '-', '(', '[', IF', 'FOR', 'WHILE', 'FUN'",
+        )
 
-        elif tok.matches(TT_KEYWORD, "FOR"):
-            for_expr = res.register(self.for_expr())
-            if res.error:
-                return res
-            return res.success(for_expr)
+    def number_atom(self):
+        """Parse an integer or float literal."""
+        res = ParseResult.new()
+        tok = self.current_tok
+        self.consume(res)
+        return res.success(NumberNode(tok))
 
-        elif tok.matches(TT_KEYWORD, "WHILE"):
-            while_expr = res.register(self.while_expr())
-            if res.error:
-                return res
-            return res.success(while_expr)
+    def string_atom(self):
+        """Parse a string literal."""
+        res = ParseResult.new()
+        tok = self.current_tok
+        self.consume(res)
+        return res.success(StringNode(tok))
 
-        elif tok.matches(TT_KEYWORD, "FUN"):
-            func_def = res.register(self.func_def())
-            if res.error:
-                return res
-            return res.success(func_def)
+    def var_access_atom(self):
+        """Parse a variable access."""
+        res = ParseResult.new()
+        tok = self.current_tok
+        self.consume(res)
+        return res.success(VarAccessNode(tok))
 
-        return res.failure(
-            InvalidSyntaxError(
-                tok.pos_start,
-                tok.pos_end,
-                "Expected int, float, identifier, '+', '-', '(', '[', IF', 'FOR', 'WHILE', 'FUN'",
+    def paren_atom(self):
+        """Parse a parenthesized expression."""
+        res = ParseResult.new()
+        self.consume(res)
+        expr = res.register(self.expr())
+        if res.error:
+            return res
+        if self.current_tok.type == TT_RPAREN:
+            self.consume(res)
+            return res.success(expr)
+        else:
+            return res.failure(
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                "Expected ')'",
             )
-        )
 
     def list_expr(self):
         """Parse a list expression enclosed in square brackets."""
-        res = ParseResult()
+        res = ParseResult.new()
         element_nodes = []
-        pos_start = self.current_tok.pos_start.copy()
+        pos_start = self.current_tok.pos_start
 
         if self.current_tok.type != TT_LSQUARE:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected '['",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected '['",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type == TT_RSQUARE:
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
         else:
             element_nodes.append(res.register(self.expr()))
             if res.error:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Expected ']', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    "Expected ']', 'VAR', 'IF', 'FOR', 'WHILE', 'FUN', int, float, identifier, '+', '-', '(', '[' or 'NOT'",
                 )
 
-            while self.current_tok.type == TT_COMMA:
-                res.register_advancement()
-                self.advance()
-
-                element_nodes.append(res.register(self.expr()))
-                if res.error:
-                    return res
+            self.more_exprs(res, element_nodes, TT_RSQUARE)
+            if res.error:
+                return res
 
             if self.current_tok.type != TT_RSQUARE:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        f"Expected ',' or ']'",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    f"Expected ',' or ']'",
                 )
 
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
-        return res.success(
-            ListNode(element_nodes, pos_start, self.current_tok.pos_end.copy())
-        )
+        return res.success(ListNode(element_nodes, pos_start, self.current_tok.pos_end))
 
     def if_expr(self):
         """Parse an if-expression, including any 'elif' and 'else' clauses."""
-        res = ParseResult()
-        all_cases = res.register(self.if_expr_cases("IF"))
+        res = ParseResult.new()
+        all_cases = res.register(self.if_expr_cases(KW_IF))
         if res.error:
             return res
         cases, else_case = all_cases
@@ -557,36 +709,34 @@ class Parser:
 
     def if_expr_b(self):
         """Parse an 'elif' clause for an if-expression."""
-        return self.if_expr_cases("ELIF")
+        return self.if_expr_cases(KW_ELIF)
 
     def if_expr_c(self):
         """Parse an 'else' clause for an if-expression."""
-        res = ParseResult()
+        res = ParseResult.new()
         else_case = None
 
-        if self.current_tok.matches(TT_KEYWORD, "ELSE"):
-            res.register_advancement()
-            self.advance()
+        if self.current_tok.type == TT_KEYWORD and self.current_tok.value is KW_ELSE:
+            self.consume(res)
 
             if self.current_tok.type == TT_NEWLINE:
-                res.register_advancement()
-                self.advance()
+                self.consume(res)
 
                 statements = res.register(self.statements())
                 if res.error:
                     return res
                 else_case = (statements, True)
 
-                if self.current_tok.matches(TT_KEYWORD, "END"):
-                    res.register_advancement()
-                    self.advance()
+                if (
+                    self.current_tok.type == TT_KEYWORD
+                    and self.current_tok.value is KW_END
+                ):
+                    self.consume(res)
                 else:
                     return res.failure(
-                        InvalidSyntaxError(
-                            self.current_tok.pos_start,
-                            self.current_tok.pos_end,
-                            "Expected 'END'",
-                        )
+                        self.current_tok.pos_start,
+                        self.current_tok.pos_end,
+                        "Expected 'END'",
                     )
             else:
                 expr = res.register(self.statement())
@@ -598,10 +748,10 @@ class Parser:
 
     def if_expr_b_or_c(self):
         """Decide whether to parse an 'elif' clause or an 'else' clause for an if-expression."""
-        res = ParseResult()
+        res = ParseResult.new()
         cases, else_case = [], None
 
-        if self.current_tok.matches(TT_KEYWORD, "ELIF"):
+        if self.current_tok.type == TT_KEYWORD and self.current_tok.value is KW_ELIF:
             all_cases = res.register(self.if_expr_b())
             if res.error:
                 return res
@@ -615,50 +765,45 @@ class Parser:
 
     def if_expr_cases(self, case_keyword):
         """Parse the cases of an if-expression for a given keyword ('IF', 'ELIF')."""
-        res = ParseResult()
+        res = ParseResult.new()
         cases = []
         else_case = None
 
-        if not self.current_tok.matches(TT_KEYWORD, case_keyword):
+        if not (
+            self.current_tok.type == TT_KEYWORD
+            and self.current_tok.value is case_keyword
+        ):
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected '{case_keyword}'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected '{case_keyword}'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         condition = res.register(self.expr())
         if res.error:
             return res
 
-        if not self.current_tok.matches(TT_KEYWORD, "THEN"):
+        if self.current_tok.type != TT_KEYWORD or self.current_tok.value is not KW_THEN:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected 'THEN'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected 'THEN'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
             statements = res.register(self.statements())
             if res.error:
                 return res
             cases.append((condition, statements, True))
 
-            if self.current_tok.matches(TT_KEYWORD, "END"):
-                res.register_advancement()
-                self.advance()
+            if self.current_tok.type == TT_KEYWORD and self.current_tok.value is KW_END:
+                self.consume(res)
             else:
                 all_cases = res.register(self.if_expr_b_or_c())
                 if res.error:
@@ -685,68 +830,55 @@ class Parser:
         Processes the loop variable, start, end, optional step, and body.
         Handles both single-statement and block (newline-separated) loop bodies.
         """
-        res = ParseResult()
+        res = ParseResult.new()
 
-        if not self.current_tok.matches(TT_KEYWORD, "FOR"):
+        if self.current_tok.type != TT_KEYWORD or self.current_tok.value is not KW_FOR:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected 'FOR'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected 'FOR'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type != TT_IDENTIFIER:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected identifier",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected identifier",
             )
 
         var_name = self.current_tok
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type != TT_EQ:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected '='",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected '='",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         start_value = res.register(self.expr())
         if res.error:
             return res
 
-        if not self.current_tok.matches(TT_KEYWORD, "TO"):
+        if self.current_tok.type != TT_KEYWORD or self.current_tok.value is not KW_TO:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected 'TO'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected 'TO'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         end_value = res.register(self.expr())
         if res.error:
             return res
 
-        if self.current_tok.matches(TT_KEYWORD, "STEP"):
-            res.register_advancement()
-            self.advance()
+        if self.current_tok.type == TT_KEYWORD and self.current_tok.value is KW_STEP:
+            self.consume(res)
 
             step_value = res.register(self.expr())
             if res.error:
@@ -754,37 +886,33 @@ class Parser:
         else:
             step_value = None
 
-        if not self.current_tok.matches(TT_KEYWORD, "THEN"):
+        if self.current_tok.type != TT_KEYWORD or self.current_tok.value is not KW_THEN:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected 'THEN'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected 'THEN'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
             body = res.register(self.statements())
             if res.error:
                 return res
 
-            if not self.current_tok.matches(TT_KEYWORD, "END"):
+            if (
+                self.current_tok.type != TT_KEYWORD
+                or self.current_tok.value is not KW_END
+            ):
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        f"Expected 'END'",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    f"Expected 'END'",
                 )
 
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
             return res.success(
                 ForNode(var_name, start_value, end_value, step_value, body, True)
@@ -803,55 +931,51 @@ class Parser:
 
         Evaluates the loop condition and body, handling both single-statement and block bodies.
         """
-        res = ParseResult()
+        res = ParseResult.new()
 
-        if not self.current_tok.matches(TT_KEYWORD, "WHILE"):
+        if (
+            self.current_tok.type != TT_KEYWORD
+            or self.current_tok.value is not KW_WHILE
+        ):
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected 'WHILE'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected 'WHILE'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         condition = res.register(self.expr())
         if res.error:
             return res
 
-        if not self.current_tok.matches(TT_KEYWORD, "THEN"):
+        if self.current_tok.type != TT_KEYWORD or self.current_tok.value is not KW_THEN:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected 'THEN'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected 'THEN'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type == TT_NEWLINE:
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
             body = res.register(self.statements())
             if res.error:
                 return res
 
-            if not self.current_tok.matches(TT_KEYWORD, "END"):
+            if (
+                self.current_tok.type != TT_KEYWORD
+                or self.current_tok.value is not KW_END
+            ):
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        f"Expected 'END'",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    f"Expected 'END'",
                 )
 
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
             return res.success(WhileNode(condition, body, True))
 
@@ -867,93 +991,73 @@ class Parser:
         Processes the function name (if provided), parameter list, and function body.
         Supports both single-expression and block-style function definitions.
         """
-        res = ParseResult()
+        res = ParseResult.new()
 
-        if not self.current_tok.matches(TT_KEYWORD, "FUN"):
+        if self.current_tok.type != TT_KEYWORD or self.current_tok.value is not KW_FUN:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected 'FUN'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected 'FUN'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type == TT_IDENTIFIER:
             var_name_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
             if self.current_tok.type != TT_LPAREN:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        f"Expected '('",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    f"Expected '('",
                 )
         else:
             var_name_tok = None
             if self.current_tok.type != TT_LPAREN:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        f"Expected identifier or '('",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    f"Expected identifier or '('",
                 )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
         arg_name_toks = []
 
         if self.current_tok.type == TT_IDENTIFIER:
             arg_name_toks.append(self.current_tok)
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
             while self.current_tok.type == TT_COMMA:
-                res.register_advancement()
-                self.advance()
+                self.consume(res)
 
                 if self.current_tok.type != TT_IDENTIFIER:
                     return res.failure(
-                        InvalidSyntaxError(
-                            self.current_tok.pos_start,
-                            self.current_tok.pos_end,
-                            f"Expected identifier",
-                        )
+                        self.current_tok.pos_start,
+                        self.current_tok.pos_end,
+                        f"Expected identifier",
                     )
 
                 arg_name_toks.append(self.current_tok)
-                res.register_advancement()
-                self.advance()
+                self.consume(res)
 
             if self.current_tok.type != TT_RPAREN:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        f"Expected ',' or ')'",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    f"Expected ',' or ')'",
                 )
         else:
             if self.current_tok.type != TT_RPAREN:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        f"Expected identifier or ')'",
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    f"Expected identifier or ')'",
                 )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type == TT_ARROW:
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
             body = res.register(self.expr())
             if res.error:
@@ -963,171 +1067,176 @@ class Parser:
 
         if self.current_tok.type != TT_NEWLINE:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected '->' or NEWLINE",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected '->' or NEWLINE",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         body = res.register(self.statements())
         if res.error:
             return res
 
-        if not self.current_tok.matches(TT_KEYWORD, "END"):
+        if self.current_tok.type != TT_KEYWORD or self.current_tok.value is not KW_END:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    f"Expected 'END'",
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                f"Expected 'END'",
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         return res.success(FuncDefNode(var_name_tok, arg_name_toks, body, False))
 
-    def bin_op(self, func_a, ops, func_b=None):
-        """Parse a binary operation using two operand parsing functions.
-
-        This is a helper method that applies an operator (or set of operators) between two expressions.
-        If func_b is not provided, it defaults to func_a.
-        """
-        if func_b == None:
-            func_b = func_a
-
-        res = ParseResult()
-        left = res.register(func_a())
-        if res.error:
-            return res
-
-        while (
-            self.current_tok.type in ops
-            or (self.current_tok.type, self.current_tok.value) in ops
-        ):
-            op_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
-            right = res.register(func_b())
-            if res.error:
-                return res
-            left = BinOpNode(left, op_tok, right)
-
-        return res.success(left)
-
     def embed_expr(self):
         """Parse an embedding expression."""
-        res = ParseResult()
-        pos_start = self.current_tok.pos_start.copy()
+        res = ParseResult.new()
 
-        if not self.current_tok.matches(TT_KEYWORD, "EMBED"):
+        if (
+            self.current_tok.type != TT_KEYWORD
+            or self.current_tok.value is not KW_EMBED
+        ):
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "Expected 'EMBED'"
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                "Expected 'EMBED'"
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         text_node = res.register(self.expr())
         if res.error:
             return res
 
         model_node = None
-        if self.current_tok.matches(TT_KEYWORD, "WITH"):
-            res.register_advancement()
-            self.advance()
+        if self.current_tok.type == TT_KEYWORD and self.current_tok.value is KW_WITH:
+            self.consume(res)
 
-            if self.current_tok.type != TT_IDENTIFIER:
+            if self.current_tok.type == TT_STRING:
+                model_node = StringNode(self.current_tok)
+            elif self.current_tok.type == TT_IDENTIFIER:
+                model_node = VarAccessNode(self.current_tok)
+            else:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Expected model identifier"
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    "Expected model identifier or string"
                 )
 
-            model_node = VarAccessNode(self.current_tok)
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
         return res.success(EmbedNode(text_node, model_node))
 
     def ai_expr(self):
         """Parse an AI model call expression."""
-        res = ParseResult()
+        res = ParseResult.new()
 
-        if not self.current_tok.matches(TT_KEYWORD, "AI"):
+        if self.current_tok.type != TT_KEYWORD or self.current_tok.value is not KW_AI:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "Expected 'AI'"
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                "Expected 'AI'"
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type != TT_IDENTIFIER:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "Expected model identifier"
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                "Expected model identifier"
             )
 
         model_name = self.current_tok
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
 
         if self.current_tok.type != TT_LPAREN:
             return res.failure(
-                InvalidSyntaxError(
-                    self.current_tok.pos_start,
-                    self.current_tok.pos_end,
-                    "Expected '('"
-                )
+                self.current_tok.pos_start,
+                self.current_tok.pos_end,
+                "Expected '('"
             )
 
-        res.register_advancement()
-        self.advance()
+        self.consume(res)
         arg_nodes = []
 
         if self.current_tok.type == TT_RPAREN:
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
         else:
             arg_nodes.append(res.register(self.expr()))
             if res.error:
                 return res
 
-            while self.current_tok.type == TT_COMMA:
-                res.register_advancement()
-                self.advance()
-
-                arg_nodes.append(res.register(self.expr()))
-                if res.error:
-                    return res
+            self.more_exprs(res, arg_nodes, TT_RPAREN)
+            if res.error:
+                return res
 
             if self.current_tok.type != TT_RPAREN:
                 return res.failure(
-                    InvalidSyntaxError(
-                        self.current_tok.pos_start,
-                        self.current_tok.pos_end,
-                        "Expected ',' or ')'"
-                    )
+                    self.current_tok.pos_start,
+                    self.current_tok.pos_end,
+                    "Expected ',' or ')'"
                 )
 
-            res.register_advancement()
-            self.advance()
+            self.consume(res)
 
         return res.success(AICallNode(model_name, arg_nodes))
+
+
+# Binary operator precedences, loosest first. 'NOT' is a prefix operator binding
+# between the logical operators and the comparisons
+PREC_LOGIC = 1
+PREC_NOT = 2
+PREC_COMPARISON = 3
+PREC_ARITH = 4
+PREC_TERM = 5
+PREC_POWER = 6
+
+# The precedence of each binary operator, and the minimum precedence of the
+# operators its right operand may contain: one more for left-associative
+# operators, the same for '^', which is right-associative
+BINARY_OPERATORS = {
+    TT_EE: (PREC_COMPARISON, PREC_ARITH),
+    TT_NE: (PREC_COMPARISON, PREC_ARITH),
+    TT_LT: (PREC_COMPARISON, PREC_ARITH),
+    TT_GT: (PREC_COMPARISON, PREC_ARITH),
+    TT_LTE: (PREC_COMPARISON, PREC_ARITH),
+    TT_GTE: (PREC_COMPARISON, PREC_ARITH),
+    TT_PLUS: (PREC_ARITH, PREC_TERM),
+    TT_MINUS: (PREC_ARITH, PREC_TERM),
+    TT_MUL: (PREC_TERM, PREC_POWER),
+    TT_DIV: (PREC_TERM, PREC_POWER),
+    TT_POW: (PREC_POWER, PREC_POWER),
+}
+KEYWORD_BINARY_OPERATORS = {
+    "AND": (PREC_LOGIC, PREC_NOT),
+    "OR": (PREC_LOGIC, PREC_NOT),
+}
+
+# The method parsing a statement that starts with a keyword, by keyword; other
+# statements are expressions
+KEYWORD_STATEMENT_PARSERS = {
+    "RETURN": Parser.return_statement,
+    "CONTINUE": Parser.continue_statement,
+    "BREAK": Parser.break_statement,
+}
+
+# The method parsing an atom that starts with a token, by token type; atoms starting
+# with a keyword are looked up by the keyword instead
+ATOM_PARSERS = {
+    TT_INT: Parser.number_atom,
+    TT_FLOAT: Parser.number_atom,
+    TT_STRING: Parser.string_atom,
+    TT_IDENTIFIER: Parser.var_access_atom,
+    TT_LPAREN: Parser.paren_atom,
+    TT_LSQUARE: Parser.list_expr,
+}
+KEYWORD_ATOM_PARSERS = {
+    "EMBED": Parser.embed_expr,
+    "AI": Parser.ai_expr,
+    "IF": Parser.if_expr,
+    "FOR": Parser.for_expr,
+    "WHILE": Parser.while_expr,
+    "FUN": Parser.func_def,
+}
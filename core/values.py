@@ -1,4 +1,8 @@
 import math
+import operator
+
+import numpy as np
+
 from utils.errors import RTError
 from execution.runtime import RTResult
 
@@ -129,11 +133,15 @@ class Value:
         return None, self.illegal_operation(other)
 
     def execute(self, args):
-        return RTResult().failure(self.illegal_operation())
+        return RTResult.new().failure(self.illegal_operation())
 
     def copy(self):
         raise Exception("No copy method defined")
 
+    def positioned(self, pos_start, pos_end, context):
+        """Return a copy placed at a new position and context, e.g. for a variable read."""
+        return self.copy().set_pos(pos_start, pos_end).set_context(context)
+
     def is_true(self):
         return False
 
@@ -263,6 +271,15 @@ class Number(Value):
         copy.set_context(self.context)
         return copy
 
+    def positioned(self, pos_start, pos_end, context):
+        # Numbers are immutable, so fill in the copy directly instead of chaining setters
+        copy = Number.__new__(Number)
+        copy.value = self.value
+        copy.pos_start = pos_start
+        copy.pos_end = pos_end
+        copy.context = context
+        return copy
+
     def is_true(self):
         return self.value != 0
 
@@ -276,6 +293,10 @@ class Number(Value):
 Number.null = Number(0)
 Number.false = Number(0)
 Number.true = Number(1)
+Number.minus_one = Number(-1)
+# Shared instances for small integers, like CPython's small int cache. Only hand them
+# out where nothing sets a position or context on the value afterwards.
+Number.small_ints = {i: Number(i) for i in range(-5, 257)}
 Number.math_PI = Number(math.pi)
 
 
@@ -343,6 +364,15 @@ class String(Value):
         copy.set_context(self.context)
         return copy
 
+    def positioned(self, pos_start, pos_end, context):
+        # Strings are immutable, so fill in the copy directly instead of chaining setters
+        copy = String.__new__(String)
+        copy.value = self.value
+        copy.pos_start = pos_start
+        copy.pos_end = pos_end
+        copy.context = context
+        return copy
+
     def __str__(self):
         return self.value
 
@@ -350,6 +380,89 @@ class String(Value):
         return f'"{self.value}"'
 
 
+# Marks an ElementList whose float32 buffer has not been built since the last change
+_STALE = object()
+
+
+class ElementList(list):
+    """The elements of a List, plus a float32 copy of their values for NumPy.
+
+    List copies share their element list, so the buffer is cached here rather than on
+    the List: a change made through any copy drops it for all of them.
+    """
+
+    __slots__ = ("buffer",)
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.buffer = _STALE
+
+    def as_array(self):
+        """Return the values as a read-only float32 array, or None unless all are Numbers."""
+        if self.buffer is _STALE:
+            if all(type(element) is Number for element in self):
+                buffer = np.fromiter(
+                    (element.value for element in self),
+                    dtype=np.float32,
+                    count=len(self),
+                )
+                buffer.flags.writeable = False
+            else:
+                buffer = None
+            self.buffer = buffer
+        return self.buffer
+
+    def append(self, value):
+        super().append(value)
+        self.buffer = _STALE
+
+    def extend(self, values):
+        super().extend(values)
+        self.buffer = _STALE
+
+    def insert(self, index, value):
+        super().insert(index, value)
+        self.buffer = _STALE
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self.buffer = _STALE
+        return value
+
+    def remove(self, value):
+        super().remove(value)
+        self.buffer = _STALE
+
+    def clear(self):
+        super().clear()
+        self.buffer = _STALE
+
+    def reverse(self):
+        super().reverse()
+        self.buffer = _STALE
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.buffer = _STALE
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.buffer = _STALE
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.buffer = _STALE
+
+    def __iadd__(self, values):
+        self.extend(values)
+        return self
+
+    def __imul__(self, count):
+        super().__imul__(count)
+        self.buffer = _STALE
+        return self
+
+
 class List(Value):
     """Represents a list value.
 
@@ -359,8 +472,19 @@ class List(Value):
 
     def __init__(self, elements):
         super().__init__()
+        if type(elements) is not ElementList:
+            elements = ElementList(elements)
         self.elements = elements
 
+    @property
+    def _np(self):
+        """The elements as a contiguous float32 array, or None if any is not a Number.
+
+        Built on first use and kept until the elements change, so numeric code reading
+        the same list again skips converting every boxed Number.
+        """
+        return self.elements.as_array()
+
     def added_to(self, other):
         new_list = self.copy()
         new_list.elements.append(other)
@@ -415,3 +539,101 @@ class List(Value):
 
     def __repr__(self):
         return f'[{", ".join([repr(x) for x in self.elements])}]'
+
+
+class EmbeddingVector:
+    """The model output behind an Embedding, shared by all of its copies.
+
+    The array is float32 by default, or float16 / int8 for quantized models; int8
+    vectors keep the scale that maps them back to the original values. normalized
+    marks unit-length vectors, whose cosine similarity is a plain dot product.
+    elements holds the Numbers built from the array once a list operation needs them.
+    """
+
+    __slots__ = ("array", "scale", "normalized", "elements")
+
+    def __init__(self, array, scale=None, normalized=False):
+        self.array = array
+        self.scale = scale
+        self.normalized = normalized
+        self.elements = None
+
+    def to_float32(self):
+        """Return the vector as float32, undoing any int8 quantization."""
+        if self.scale is None:
+            return self.array.astype("float32", copy=False)
+        return self.array.astype("float32") * self.scale
+
+
+class Embedding(List):
+    """Represents an embedding vector.
+
+    Holds the model output as a contiguous NumPy array instead of a list of boxed
+    Number values, so similarity computations can use the buffer directly. It is still
+    a List: the Numbers are built from the array the first time a list operation or
+    builtin reads 'elements', and are shared by every copy like a List's. From then on
+    they may change, so 'vector' is None and the List buffer stands in for the array.
+    """
+
+    def __init__(self, array, scale=None, normalized=False):
+        Value.__init__(self)
+        self.shared = EmbeddingVector(array, scale, normalized)
+
+    @property
+    def vector(self):
+        """The model output, or None once the elements have been built."""
+        shared = self.shared
+        return shared if shared.elements is None else None
+
+    @property
+    def elements(self):
+        shared = self.shared
+        if shared.elements is None:
+            shared.elements = ElementList(
+                Number(x) for x in shared.to_float32().tolist()
+            )
+        return shared.elements
+
+    def dived_by(self, other):
+        vector = self.vector
+        if vector is None or not isinstance(other, Number):
+            return List.dived_by(self, other)
+
+        try:
+            value = vector.array[operator.index(other.value)]
+        except TypeError:
+            return None, RTError(
+                other.pos_start,
+                other.pos_end,
+                "Embedding index must be an integer",
+                self.context,
+            )
+        except IndexError:
+            return None, RTError(
+                other.pos_start,
+                other.pos_end,
+                "Element at this index could not be retrieved from list because index is out of bounds",
+                self.context,
+            )
+        if vector.scale is not None:
+            value = value.astype("float32") * vector.scale
+        return Number(float(value)).set_context(self.context), None
+
+    def copy(self):
+        copy = Embedding.__new__(Embedding)
+        copy.shared = self.shared
+        copy.set_pos(self.pos_start, self.pos_end)
+        copy.set_context(self.context)
+        return copy
+
+    def __str__(self):
+        vector = self.vector
+        if vector is None:
+            return List.__str__(self)
+        return ", ".join([str(x) for x in vector.to_float32().tolist()])
+
+    def __repr__(self):
+        vector = self.vector
+        if vector is None:
+            return List.__repr__(self)
+        return f'[{", ".join([repr(x) for x in vector.to_float32().tolist()])}]'
@@ -23,6 +23,8 @@ def parse_args():
     parser.add_argument('-O', '--optimize', type=int, choices=[0, 1, 2, 3], default=0,
                         help='Optimization level (0-3)')
     parser.add_argument('-g', '--debug', action='store_true', help='Include debug information')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="Don't list each token and declaration found")
 
     return parser.parse_args()
 
@@ -34,67 +36,90 @@ def read_input_file(filename):
         print(f"Error reading input file: {e}", file=sys.stderr)
         sys.exit(1)
 
-def tokenize(source):
-    """Simple tokenizer for demonstration purposes"""
+# Keywords are lexed as identifiers and then recognized with a set lookup, rather than
+# by trying every keyword at each token; KEYWORD_RE checks the word boundaries a
+# keyword needs, e.g. one directly after a number is an identifier
+KEYWORDS = frozenset(('var', 'fun', 'if', 'then', 'elif', 'else', 'for', 'to', 'step',
+                      'while', 'end', 'return', 'EMBED', 'WITH', 'AI'))
+KEYWORD_RE = re.compile(r'\b(' + '|'.join(sorted(KEYWORDS)) + r')\b')
+
+# Token patterns, tried in order at each position
+TOKEN_PATTERNS = [
+    ('IDENTIFIER', r'[a-zA-Z_][a-zA-Z0-9_]*'),
+    ('NUMBER', r'\d+(\.\d+)?'),
+    ('STRING', r'"[^"]*"'),
+    ('OPERATOR', r'[\+\-\*/=<>!&|]'),
+    ('PUNCTUATION', r'[\(\)\[\]\{\},;:]'),
+    ('NEWLINE', r'\n'),
+    ('WHITESPACE', r'[ \t]+'),
+    ('COMMENT', r'#.*'),
+]
+
+# The patterns combined into one regex, compiled once
+TOKEN_RE = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in TOKEN_PATTERNS))
+# Token type by group number; a match's lastindex is the number of the named group
+# that matched, as it closes after any group nested in it
+TOKEN_TYPES = {index: name for name, index in TOKEN_RE.groupindex.items()}
+SKIPPED_TOKENS = frozenset(('WHITESPACE', 'COMMENT'))
+
+def tokenize(source, verbose=True):
+    """Simple tokenizer for demonstration purposes; verbose lists every token"""
     print("Lexical Analysis (Tokenization):")
     print("-" * 40)
 
-    # Define token patterns
-    patterns = [
-        ('KEYWORD', r'\b(var|fun|if|then|elif|else|for|to|step|while|end|return|EMBED|WITH|AI)\b'),
-        ('IDENTIFIER', r'[a-zA-Z_][a-zA-Z0-9_]*'),
-        ('NUMBER', r'\d+(\.\d+)?'),
-        ('STRING', r'"[^"]*"'),
-        ('OPERATOR', r'[\+\-\*/=<>!&|]'),
-        ('PUNCTUATION', r'[\(\)\[\]\{\},;:]'),
-        ('NEWLINE', r'\n'),
-        ('WHITESPACE', r'[ \t]+'),
-        ('COMMENT', r'#.*'),
-    ]
-
-    # Combine patterns
-    token_regex = '|'.join(f'(?P<{name}>{pattern})' for name, pattern in patterns)
-
     # Tokenize
     tokens = []
+    lines = []
     line_num = 1
-    for match in re.finditer(token_regex, source):
-        token_type = match.lastgroup
-        token_value = match.group()
+    for match in TOKEN_RE.finditer(source):
+        token_type = TOKEN_TYPES[match.lastindex]
 
         if token_type == 'NEWLINE':
             line_num += 1
             continue
-        elif token_type in ('WHITESPACE', 'COMMENT'):
+        elif token_type in SKIPPED_TOKENS:
             continue
 
+        token_value = match.group()
+        if (token_type == 'IDENTIFIER' and token_value in KEYWORDS
+                and KEYWORD_RE.match(source, match.start())):
+            token_type = 'KEYWORD'
         tokens.append((token_type, token_value, line_num))
-        print(f"  {token_type:<12} {token_value:<20} (line {line_num})")
+        if verbose:
+            lines.append(f"  {token_type:<12} {token_value:<20} (line {line_num})")
 
+    # The listing is printed in one write rather than a line per token
+    if lines:
+        print("\n".join(lines))
     print(f"\nTotal tokens: {len(tokens)}")
     print()
     return tokens
 
-def parse(tokens):
-    """Simple parser for demonstration purposes"""
+def parse(tokens, verbose=True):
+    """Simple parser for demonstration purposes; verbose lists every declaration"""
     print("Syntax Analysis (Parsing):")
     print("-" * 40)
 
     # Just a simulation of parsing for the demo
     functions = []
     variables = []
+    lines = []
 
     for i, (token_type, token_value, line_num) in enumerate(tokens):
         if token_type == 'KEYWORD' and token_value == 'fun':
             if i + 1 < len(tokens) and tokens[i+1][0] == 'IDENTIFIER':
                 functions.append(tokens[i+1][1])
-                print(f"  Found function definition: {tokens[i+1][1]} (line {line_num})")
+                if verbose:
+                    lines.append(f"  Found function definition: {tokens[i+1][1]} (line {line_num})")
 
         if token_type == 'KEYWORD' and token_value == 'var':
             if i + 1 < len(tokens) and tokens[i+1][0] == 'IDENTIFIER':
                 variables.append(tokens[i+1][1])
-                print(f"  Found variable declaration: {tokens[i+1][1]} (line {line_num})")
+                if verbose:
+                    lines.append(f"  Found variable declaration: {tokens[i+1][1]} (line {line_num})")
 
+    if lines:
+        print("\n".join(lines))
     print(f"\nFound {len(functions)} functions and {len(variables)} variables")
     print()
     return {'functions': functions, 'variables': variables}
@@ -282,10 +307,10 @@ def main():
     source = read_input_file(args.input_file)
 
     # Tokenize the source
-    tokens = tokenize(source)
+    tokens = tokenize(source, not args.quiet)
 
     # Parse the tokens
-    ast = parse(tokens)
+    ast = parse(tokens, not args.quiet)
 
     # Generate C++ code
     cpp_code = generate_cpp_code(ast, args.input_file)
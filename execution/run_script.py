@@ -1,25 +1,5 @@
-from core.interpreter import Interpreter
-from core.lexer import Lexer
-from core.parser import Parser
-from builtins import global_symbol_table
-
-from core.values import Context
+from functions import builtinfun
 
 
 def run(fn, text):
-    lexer = Lexer(fn, text)
-    tokens, error = lexer.make_tokens()
-    if error:
-        return None, error
-
-    parser = Parser(tokens)
-    ast = parser.parse()
-    if ast.error:
-        return None, ast.error
-
-    interpreter = Interpreter()
-    context = Context("<program>")
-    context.symbol_table = global_symbol_table
-    result = interpreter.visit(ast.node, context)
-
-    return result.value, result.error
+    return builtinfun.run(fn, text)
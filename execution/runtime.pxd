@@ -0,0 +1,10 @@
+# Cython declarations for runtime.py (pure Python mode).
+# Only used when the module is compiled, e.g. `cythonize -i -3 execution/runtime.py`.
+
+cdef class RTResult:
+    cdef public object value
+    cdef public object error
+    cdef public object func_return_value
+    cdef public bint loop_should_continue
+    cdef public bint loop_should_break
+    cdef public int signals
@@ -2,6 +2,16 @@
 # RUNTIME RESULT
 #######################################
 
+# Results released by RTResult.register and unwrap, handed out again by RTResult.new
+_free_results = []
+MAX_FREE_RESULTS = 256
+
+# Bits of RTResult.signals, one for each reason to stop executing
+SIGNAL_ERROR = 1
+SIGNAL_RETURN = 2
+SIGNAL_CONTINUE = 4
+SIGNAL_BREAK = 8
+
 
 class RTResult:
     """
@@ -13,59 +23,111 @@ class RTResult:
         func_return_value (any): A function's return value, if a return statement was executed.
         loop_should_continue (bool): Flag indicating if the current loop should continue.
         loop_should_break (bool): Flag indicating if the current loop should break."
+        signals (int): The SIGNAL_* bits of the above that are set, tested by should_return.
     """
 
-    def __init__(self):
-        self.reset()
+    __slots__ = (
+        "value",
+        "error",
+        "func_return_value",
+        "loop_should_continue",
+        "loop_should_break",
+        "signals",
+    )
 
-    def reset(self):
-        """Reset the internal state of the RTResult to its default values."""
+    def __init__(self):
         self.value = None
         self.error = None
         self.func_return_value = None
         self.loop_should_continue = False
         self.loop_should_break = False
+        self.signals = 0
+
+    @staticmethod
+    def new():
+        """Return a reset RTResult, reusing a released one when available.
+
+        Function and builtin 'execute' calls return results that live only until the
+        caller unwraps or registers them, so recycling them spares an allocation and an
+        __init__ call per call.
+        """
+        try:
+            res = _free_results.pop()
+        except IndexError:
+            return RTResult()
+        res.value = None
+        res.error = None
+        res.func_return_value = None
+        res.loop_should_continue = False
+        res.loop_should_break = False
+        res.signals = 0
+        return res
 
     def register(self, res):
         """Register the result from a sub-expression.
 
         This method propagates error and control signals (like function return, continue, and break)
-        from the given result, and returns its value.
+        from the given result, and returns its value. The registered result must not be used
+        afterwards: it is released for reuse by RTResult.new.
         """
         self.error = res.error
         self.func_return_value = res.func_return_value
         self.loop_should_continue = res.loop_should_continue
         self.loop_should_break = res.loop_should_break
-        return res.value
+        self.signals = res.signals
+        value = res.value
+        if len(_free_results) < MAX_FREE_RESULTS:
+            _free_results.append(res)
+        return value
 
     def success(self, value):
         """Mark the result as a successful execution with a given value."""
-        self.reset()
         self.value = value
+        self.error = None
+        self.func_return_value = None
+        self.loop_should_continue = False
+        self.loop_should_break = False
+        self.signals = 0
         return self
 
     def success_return(self, value):
         """Mark the result as a function return with a given value."""
-        self.reset()
+        self.value = None
+        self.error = None
         self.func_return_value = value
+        self.loop_should_continue = False
+        self.loop_should_break = False
+        self.signals = SIGNAL_RETURN
         return self
 
     def success_continue(self):
         """Mark the result as signaling a loop continue."""
-        self.reset()
+        self.value = None
+        self.error = None
+        self.func_return_value = None
         self.loop_should_continue = True
+        self.loop_should_break = False
+        self.signals = SIGNAL_CONTINUE
         return self
 
     def success_break(self):
         """Mark the result as signaling a loop break."""
-        self.reset()
+        self.value = None
+        self.error = None
+        self.func_return_value = None
+        self.loop_should_continue = False
         self.loop_should_break = True
+        self.signals = SIGNAL_BREAK
         return self
 
     def failure(self, error):
         """Mark the result as a failure with an error."""
-        self.reset()
+        self.value = None
         self.error = error
+        self.func_return_value = None
+        self.loop_should_continue = False
+        self.loop_should_break = False
+        self.signals = SIGNAL_ERROR
         return self
 
     def should_return(self):
@@ -76,10 +138,79 @@ class RTResult:
             - A function return value was set.
             - A loop should continue.
             - A loop should break.
+        The methods setting them record each in 'signals', so one test covers all four.
+        """
+        return self.signals
+
+    def unwrap(self):
+        """Return the value of a finished call, raising its error or loop signal instead.
+
+        This bridges results returned by 'execute' into the interpreter, which propagates
+        errors and control flow as exceptions. Like 'register', it releases the result.
         """
-        return (
-            self.error
-            or self.func_return_value
-            or self.loop_should_continue
-            or self.loop_should_break
-        )
+        if self.signals:
+            if self.error:
+                raise RTException(self.error)
+            if self.loop_should_break:
+                raise RTBreak()
+            if self.loop_should_continue:
+                raise RTContinue()
+        value = self.value
+        if len(_free_results) < MAX_FREE_RESULTS:
+            _free_results.append(self)
+        return value
+
+
+#######################################
+# CONTROL FLOW SIGNALS
+#######################################
+
+
+class RTException(Exception):
+    """Carries a runtime error up to the enclosing function call or program."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+class RTReturn(Exception):
+    """Raised by RETURN; carries the returned value up to the enclosing function call."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class RTBreak(Exception):
+    """Raised by BREAK; ends the innermost loop."""
+
+
+class RTContinue(Exception):
+    """Raised by CONTINUE; moves the innermost loop to its next iteration."""
+
+
+#######################################
+# LOOP RANGE
+#######################################
+
+
+def loop_range(start, end, step):
+    """Return an iterable over the values taken by a FOR loop variable.
+
+    Integer bounds with a non-zero step use the built-in range; anything else
+    (floats, a zero step) is stepped manually with the same comparisons.
+    """
+    if type(start) is int and type(end) is int and type(step) is int and step != 0:
+        return range(start, end, step)
+    return _stepped_range(start, end, step)
+
+
+def _stepped_range(start, end, step):
+    i = start
+    if step >= 0:
+        while i < end:
+            yield i
+            i += step
+    else:
+        while i > end:
+            yield i
+            i += step
@@ -1,10 +1,10 @@
-import basic  # type: ignore
+from functions.builtinfun import run
 
 while True:
     text = input("basic > ")
     if text.strip() == "":
         continue
-    result, error = basic.run("<stdin>", text)
+    result, error = run("<stdin>", text)
 
     if error:
         print(error.as_string())
@@ -23,24 +23,25 @@ class BaseFunction(Value):
 
     def check_args(self, arg_names, args):
         """Check if the number of arguments provided matches the expected number."""
-        res = RTResult()
+        res = RTResult.new()
+        extra_count = len(args) - len(arg_names)
 
-        if len(args) > len(arg_names):
+        if extra_count > 0:
             return res.failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
-                    f"{len(args) - len(arg_names)} too many args passed into {self}",
+                    f"{extra_count} too many args passed into {self}",
                     self.context,
                 )
             )
 
-        if len(args) < len(arg_names):
+        if extra_count < 0:
             return res.failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
-                    f"{len(arg_names) - len(args)} too few args passed into {self}",
+                    f"{-extra_count} too few args passed into {self}",
                     self.context,
                 )
             )
@@ -49,17 +50,19 @@ class BaseFunction(Value):
 
     def populate_args(self, arg_names, args, exec_ctx):
         """Populate the function's execution context with the provided arguments."""
-        for i in range(len(args)):
-            arg_name = arg_names[i]
-            arg_value = args[i]
+        # Stored straight into the new context's own table, which 'set' would do
+        symbols = exec_ctx.symbol_table.symbols
+        for arg_name, arg_value in zip(arg_names, args):
             arg_value.set_context(exec_ctx)
-            exec_ctx.symbol_table.set(arg_name, arg_value)
+            symbols[arg_name] = arg_value
 
     def check_and_populate_args(self, arg_names, args, exec_ctx):
-        """Check argument count and, if valid, populate the function's execution context with arguments."""
-        res = RTResult()
-        res.register(self.check_args(arg_names, args))
-        if res.should_return():
-            return res
+        """Check argument count and, if valid, populate the function's execution context with arguments.
+
+        Returns the argument count error, or None, so calls with the right arity
+        build no result object.
+        """
+        if len(args) != len(arg_names):
+            return self.check_args(arg_names, args).error
         self.populate_args(arg_names, args, exec_ctx)
-        return res.success(None)
+        return None
@@ -1,34 +1,53 @@
 import os
 from functions.basefun import BaseFunction
 from utils.errors import RTError
-from execution.runtime import RTResult
-from core.values import List, Number, String
-from core.interpreter import Interpreter
+from execution.runtime import RTBreak, RTContinue, RTException, RTResult, RTReturn
+from core.values import Embedding, List, Number, String
+from core.interpreter import shared_interpreter
 from core.lexer import Lexer
 from core.parser import Parser
 from core.values import Context, Number, SymbolTable
 
 
-def run(fn, text):
-    # Generate tokens
+def parse(fn, text):
+    # Generate the AST, lexing tokens as the parser reads them
     lexer = Lexer(fn, text)
-    tokens, error = lexer.make_tokens()
-    if error:
-        return None, error
-
-    # Generate AST
+    tokens = lexer.iter_tokens()
     parser = Parser(tokens)
     ast = parser.parse()
+    # Lex whatever the parser left unread, so a lexing error is reported first
+    for _ in tokens:
+        pass
+    if lexer.error:
+        return None, lexer.error
     if ast.error:
         return None, ast.error
 
+    return ast.node, None
+
+
+def run_ast(node):
     # Run program
-    interpreter = Interpreter()
+    interpreter = shared_interpreter()
     context = Context("<program>")
     context.symbol_table = global_symbol_table
-    result = interpreter.visit(ast.node, context)
+    try:
+        value = interpreter.visit(node, context)
+    except RTException as e:
+        return None, e.error
+    except (RTReturn, RTBreak, RTContinue):
+        # A stray RETURN, BREAK or CONTINUE ends the program
+        return None, None
+
+    return value, None
+
 
-    return result.value, result.error
+def run(fn, text):
+    node, error = parse(fn, text)
+    if error:
+        return None, error
+
+    return run_ast(node)
 
 
 class BuiltInFunction(BaseFunction):
@@ -47,15 +66,15 @@ class BuiltInFunction(BaseFunction):
           3. Checks that the correct number of arguments is provided.
           4. Calls the specific built-in function implementation and returns its result.
         """
-        res = RTResult()
+        res = RTResult.new()
         exec_ctx = self.generate_new_context()
 
         method_name = f"execute_{self.name}"
         method = getattr(self, method_name, self.no_visit_method)
 
-        res.register(self.check_and_populate_args(method.arg_names, args, exec_ctx))
-        if res.should_return():
-            return res
+        error = self.check_and_populate_args(method.arg_names, args, exec_ctx)
+        if error:
+            return res.failure(error)
 
         return_value = res.register(method(exec_ctx))
         if res.should_return():
@@ -82,7 +101,7 @@ class BuiltInFunction(BaseFunction):
     def execute_print(self, exec_ctx):
         """Built-in function to print a value to the console."""
         print(str(exec_ctx.symbol_table.get("value")))
-        return RTResult().success(Number.null)
+        return RTResult.new().success(Number.null)
 
     execute_print.arg_names = ["value"]
 
@@ -91,14 +110,14 @@ class BuiltInFunction(BaseFunction):
 
         Retrieves the value associated with the key "value" and returns it as a String.
         """
-        return RTResult().success(String(str(exec_ctx.symbol_table.get("value"))))
+        return RTResult.new().success(String(str(exec_ctx.symbol_table.get("value"))))
 
     execute_print_ret.arg_names = ["value"]
 
     def execute_input(self, exec_ctx):
         """Built-in function to take input from the user."""
         text = input()
-        return RTResult().success(String(text))
+        return RTResult.new().success(String(text))
 
     execute_input.arg_names = []
 
@@ -111,42 +130,42 @@ class BuiltInFunction(BaseFunction):
                 break
             except ValueError:
                 print(f"'{text}' must be an integer. Try again!")
-        return RTResult().success(Number(number))
+        return RTResult.new().success(Number(number))
 
     execute_input_int.arg_names = []
 
     def execute_clear(self, exec_ctx):
         """Built-in function to clear the console."""
         os.system("cls" if os.name == "nt" else "cls")
-        return RTResult().success(Number.null)
+        return RTResult.new().success(Number.null)
 
     execute_clear.arg_names = []
 
     def execute_is_number(self, exec_ctx):
         """Built-in function to check if a value is a Number."""
         is_number = isinstance(exec_ctx.symbol_table.get("value"), Number)
-        return RTResult().success(Number.true if is_number else Number.false)
+        return RTResult.new().success(Number.true if is_number else Number.false)
 
     execute_is_number.arg_names = ["value"]
 
     def execute_is_string(self, exec_ctx):
         """Built-in function to check if a value is a String."""
         is_number = isinstance(exec_ctx.symbol_table.get("value"), String)
-        return RTResult().success(Number.true if is_number else Number.false)
+        return RTResult.new().success(Number.true if is_number else Number.false)
 
     execute_is_string.arg_names = ["value"]
 
     def execute_is_list(self, exec_ctx):
         """Built-in function to check if a value is a List."""
         is_number = isinstance(exec_ctx.symbol_table.get("value"), List)
-        return RTResult().success(Number.true if is_number else Number.false)
+        return RTResult.new().success(Number.true if is_number else Number.false)
 
     execute_is_list.arg_names = ["value"]
 
     def execute_is_function(self, exec_ctx):
         """Built-in function to check if a value is a function."""
         is_number = isinstance(exec_ctx.symbol_table.get("value"), BaseFunction)
-        return RTResult().success(Number.true if is_number else Number.false)
+        return RTResult.new().success(Number.true if is_number else Number.false)
 
     execute_is_function.arg_names = ["value"]
 
@@ -156,7 +175,7 @@ class BuiltInFunction(BaseFunction):
         value = exec_ctx.symbol_table.get("value")
 
         if not isinstance(list_, List):
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -166,7 +185,7 @@ class BuiltInFunction(BaseFunction):
             )
 
         list_.elements.append(value)
-        return RTResult().success(Number.null)
+        return RTResult.new().success(Number.null)
 
     execute_append.arg_names = ["list", "value"]
 
@@ -176,7 +195,7 @@ class BuiltInFunction(BaseFunction):
         index = exec_ctx.symbol_table.get("index")
 
         if not isinstance(list_, List):
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -186,7 +205,7 @@ class BuiltInFunction(BaseFunction):
             )
 
         if not isinstance(index, Number):
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -198,7 +217,7 @@ class BuiltInFunction(BaseFunction):
         try:
             element = list_.elements.pop(index.value)
         except:
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -206,7 +225,7 @@ class BuiltInFunction(BaseFunction):
                     exec_ctx,
                 )
             )
-        return RTResult().success(element)
+        return RTResult.new().success(element)
 
     execute_pop.arg_names = ["list", "index"]
 
@@ -216,7 +235,7 @@ class BuiltInFunction(BaseFunction):
         listB = exec_ctx.symbol_table.get("listB")
 
         if not isinstance(listA, List):
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -226,7 +245,7 @@ class BuiltInFunction(BaseFunction):
             )
 
         if not isinstance(listB, List):
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -236,7 +255,7 @@ class BuiltInFunction(BaseFunction):
             )
 
         listA.elements.extend(listB.elements)
-        return RTResult().success(Number.null)
+        return RTResult.new().success(Number.null)
 
     execute_extend.arg_names = ["listA", "listB"]
 
@@ -244,8 +263,8 @@ class BuiltInFunction(BaseFunction):
         """Built-in function to obtain the length of a list or string."""
         list_ = exec_ctx.symbol_table.get("list")
 
-        if not isinstance(list_, List) and not isinstance(list_, String):
-            return RTResult().failure(
+        if not isinstance(list_, (List, String)):
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -254,10 +273,14 @@ class BuiltInFunction(BaseFunction):
                 )
             )
 
+        # An embedding's length needs no Numbers built from its array
+        if isinstance(list_, Embedding) and list_.vector is not None:
+            return RTResult.new().success(Number(len(list_.vector.array)))
+
         if isinstance(list_, List):
-            return RTResult().success(Number(len(list_.elements)))
+            return RTResult.new().success(Number(len(list_.elements)))
 
-        return RTResult().success(Number(len(list_.value)))
+        return RTResult.new().success(Number(len(list_.value)))
 
     execute_len.arg_names = ["list"]
 
@@ -266,7 +289,7 @@ class BuiltInFunction(BaseFunction):
         fn = exec_ctx.symbol_table.get("fn")
 
         if not isinstance(fn, String):
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -281,7 +304,7 @@ class BuiltInFunction(BaseFunction):
             with open(fn, "r") as f:
                 script = f.read()
         except Exception as e:
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -293,7 +316,7 @@ class BuiltInFunction(BaseFunction):
         _, error = run(fn, script)
 
         if error:
-            return RTResult().failure(
+            return RTResult.new().failure(
                 RTError(
                     self.pos_start,
                     self.pos_end,
@@ -302,7 +325,7 @@ class BuiltInFunction(BaseFunction):
                 )
             )
 
-        return RTResult().success(Number.null)
+        return RTResult.new().success(Number.null)
 
     execute_run.arg_names = ["fn"]
 
@@ -0,0 +1,194 @@
+"""Differential tests: the compiled scanner against the Python lexer.
+
+Long ASCII sources are tokenized by the Numba scanner in core._lex_numba. Its tokens,
+values and positions must match the Python lexer's exactly, and a source with an error
+must fall back to the Python lexer so the error is reported as before.
+"""
+
+import random
+
+import pytest
+
+import core.lexer
+from core.lexer import NATIVE_SCAN_MIN_LENGTH, Lexer, scan
+
+pytestmark = pytest.mark.skipif(scan is None, reason="Numba is not installed")
+
+FRAGMENTS = [
+    "VAR",
+    "x",
+    "a_1",
+    "FUN",
+    "f",
+    "->",
+    "RETURN",
+    "IF",
+    "THEN",
+    "ELIF",
+    "ELSE",
+    "END",
+    "FOR",
+    "TO",
+    "STEP",
+    "WHILE",
+    "CONTINUE",
+    "BREAK",
+    "AND",
+    "OR",
+    "NOT",
+    "EMBED",
+    "WITH",
+    "AI",
+    "PIPE",
+    "0",
+    "42",
+    "3.25",
+    "7.",
+    "0.5",
+    "+",
+    "-",
+    "*",
+    "/",
+    "^",
+    "=",
+    "==",
+    "!=",
+    "<",
+    "<=",
+    ">",
+    ">=",
+    "(",
+    ")",
+    "[",
+    "]",
+    ",",
+    ";",
+    "\n",
+    "\t",
+    "  ",
+    '"plain"',
+    '""',
+    '"tab\\there"',
+    '"quote \\" inside"',
+    '"line\\nbreak"',
+    '"back\\\\slash"',
+    '"unknown \\q escape"',
+    "# a comment\n",
+]
+
+
+def random_source(rng, min_length=NATIVE_SCAN_MIN_LENGTH + 1):
+    parts = []
+    length = 0
+    while length < min_length:
+        fragment = rng.choice(FRAGMENTS) + rng.choice([" ", " ", "\t", "\n"])
+        parts.append(fragment)
+        length += len(fragment)
+    return "".join(parts)
+
+
+def dump(tokens):
+    return [
+        (
+            token.type,
+            type(token.value),
+            token.value,
+            (token.pos_start.idx, token.pos_start.ln, token.pos_start.col),
+            (token.pos_end.idx, token.pos_end.ln, token.pos_end.col),
+        )
+        for token in tokens
+    ]
+
+
+def dump_error(error):
+    return (
+        error.error_name,
+        error.details,
+        (error.pos_start.idx, error.pos_start.ln, error.pos_start.col),
+        (error.pos_end.idx, error.pos_end.ln, error.pos_end.col),
+    )
+
+
+def python_tokens(monkeypatch, text):
+    """Tokenize text with the Python lexer only."""
+    with monkeypatch.context() as patch:
+        patch.setattr(core.lexer, "NATIVE_SCAN_MIN_LENGTH", len(text) + 1)
+        return Lexer("<test>", text).make_tokens()
+
+
+def assert_native_matches(monkeypatch, text):
+    assert len(text) >= NATIVE_SCAN_MIN_LENGTH and text.isascii()
+    expected, error = python_tokens(monkeypatch, text)
+    assert error is None, error.as_string()
+
+    stream = Lexer("<test>", text).make_tokens_native()
+    assert stream is not None
+    assert dump(stream.to_list()) == dump(expected)
+
+    tokens, error = Lexer("<test>", text).make_tokens()
+    assert error is None
+    assert dump(tokens) == dump(expected)
+    assert dump(Lexer("<test>", text).iter_tokens()) == dump(expected)
+
+
+def assert_native_falls_back(monkeypatch, text):
+    assert len(text) >= NATIVE_SCAN_MIN_LENGTH and text.isascii()
+    _, expected = python_tokens(monkeypatch, text)
+    assert expected is not None
+
+    assert Lexer("<test>", text).make_tokens_native() is None
+    tokens, error = Lexer("<test>", text).make_tokens()
+    assert tokens == []
+    assert dump_error(error) == dump_error(expected)
+
+    lexer = Lexer("<test>", text)
+    for _ in lexer.iter_tokens():
+        pass
+    assert dump_error(lexer.error) == dump_error(expected)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_source(monkeypatch, seed):
+    assert_native_matches(monkeypatch, random_source(random.Random(seed)))
+
+
+@pytest.mark.parametrize(
+    "ending",
+    [
+        "# comment at EOF",
+        "#",
+        "x # trailing",
+        "\n# last line",
+        '"done"',
+        '"unterminated at EOF',
+        '"escape at EOF\\',
+        "1.",
+        ";",
+    ],
+)
+def test_source_ending(monkeypatch, ending):
+    assert_native_matches(monkeypatch, random_source(random.Random(ending)) + ending)
+
+
+def test_escapes(monkeypatch):
+    line = 'VAR s = "a\\tb\\nc\\"d\\\\e\\zf" + "" + "\\\\" + "\\""\n'
+    text = line * (NATIVE_SCAN_MIN_LENGTH // len(line) + 1)
+    assert_native_matches(monkeypatch, text)
+
+
+@pytest.mark.parametrize(
+    "bad",
+    ["$", "@", "`", "{", "!", "! =", "'", "\x00", "\r"],
+)
+@pytest.mark.parametrize("where", ["start", "middle", "end"])
+def test_error_falls_back(monkeypatch, bad, where):
+    source = random_source(random.Random(f"{bad}{where}"))
+    if where == "start":
+        text = bad + " " + source
+    elif where == "middle":
+        # At the start of a line, so it is not inside a comment
+        middle = source.index("\n", len(source) // 2) + 1
+        text = source[:middle] + bad + " " + source[middle:]
+    else:
+        text = source + "\n" + bad
+    assert_native_falls_back(monkeypatch, text)
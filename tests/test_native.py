@@ -0,0 +1,214 @@
+"""Differential tests: compiled function bodies against the interpreter.
+
+Function.execute runs bodies in the numeric subset through core.codegen_py: as
+generated Python (NativeFunction.python) and, for float arguments, as a Numba float64
+twin (NativeFunction.jitted). Each must return exactly what the interpreter returns, or
+raise wherever the interpreter fails so that execute falls back to it.
+"""
+
+import math
+import random
+
+import pytest
+
+from core.codegen_py import numba
+from core.values import Number
+from functions.builtinfun import run
+
+ERROR = "error"
+
+
+def define(source):
+    """Run a program made of one FUN definition and return the Function value."""
+    value, error = run("<test>", source)
+    assert error is None, error.as_string()
+    function = value.elements[0]
+    assert function.native is not None, "body is outside the numeric subset"
+    return function
+
+
+def interpreted(function, values):
+    """Return what the tree-walking interpreter computes, or ERROR."""
+    reference = function.copy()
+    reference.native = None
+    reference.code = None
+    try:
+        res = reference.execute([Number(value) for value in values])
+    except Exception:
+        return ERROR
+    if res.should_return():
+        return ERROR
+    return res.value.value
+
+
+def outcome(call, values):
+    try:
+        value = call(*values)
+    except Exception:
+        return ERROR
+    return 0 if value is None else value
+
+
+def assert_same(actual, expected, label):
+    if expected is ERROR or actual is ERROR:
+        assert actual is expected, label
+        return
+    assert type(actual) is type(expected), label
+    if isinstance(expected, float) and math.isnan(expected):
+        assert math.isnan(actual), label
+    else:
+        assert actual == expected, label
+
+
+def check(function, args, jitted=False):
+    """Compare both native paths with the interpreter on every argument tuple.
+
+    With jitted set, the body must also be compiled by Numba when it is installed.
+    """
+    native = function.native
+    if jitted and numba is not None:
+        assert native.float_safe
+        assert native.jit() is not None
+    for values in args:
+        label = f"{native.source}{values}"
+        expected = interpreted(function, values)
+        assert_same(outcome(native.python, values), expected, label)
+        if native.float_safe and all(type(value) is float for value in values):
+            assert_same(outcome(native.jit(), values), expected, label)
+        assert_same(outcome(lambda *v: native(v), values), expected, label)
+
+
+def test_int_overflow():
+    # Python ints never overflow, so int arithmetic must stay off the float64 path
+    function = define("FUN f(a) -> a * a * a * a * a")
+    check(function, [(10**6,), (-(10**15),), (3,), (2.5,), (-1e300,), (1e308,)])
+
+    function = define(
+        "FUN f(n)\nVAR x = 1\nFOR i = 0 TO n THEN VAR x = x * 3\nRETURN x\nEND"
+    )
+    assert not function.native.float_safe
+    check(function, [(100,), (0,), (70.0,)])
+
+
+def test_pow_complex():
+    # A negative base with a fractional exponent is complex in Python, nan in float64
+    function = define("FUN f(a, b) -> a ^ b")
+    assert not function.native.float_safe
+    check(
+        function,
+        [
+            (-8.0, 0.5),
+            (-8, 1.0 / 3),
+            (2, 10),
+            (2, -1),
+            (0, -1),
+            (0.0, -1.0),
+            (10.0, 400),
+        ],
+    )
+
+
+def test_division_by_zero():
+    function = define("FUN f(a, b) -> a / b")
+    check(function, [(1, 0), (1.0, 0.0), (0.0, 0.0), (-3.5, 0.0), (7, 2), (1.0, 4.0)])
+
+
+def test_unbound_local():
+    function = define("FUN f(a)\nIF a > 0 THEN VAR b = a * 2.0\nRETURN b\nEND")
+    assert not function.native.float_safe
+    check(function, [(1,), (-1,), (1.5,), (-1.5,), (0.0,)])
+
+
+def test_for_break_continue():
+    function = define(
+        "FUN f(n)\n"
+        "VAR s = 0.0\n"
+        "FOR i = 0.0 TO n THEN\n"
+        "IF i == 3.0 THEN CONTINUE\n"
+        "IF i > 7.0 THEN BREAK\n"
+        "VAR s = s + i\n"
+        "END\n"
+        "RETURN s\n"
+        "END"
+    )
+    check(function, [(0.0,), (4.0,), (5.5,), (20.0,), (-3.0,), (6,)], jitted=True)
+
+
+def test_while_break_continue():
+    function = define(
+        "FUN f(n, step)\n"
+        "VAR s = 0.0\n"
+        "VAR i = 0.0\n"
+        "WHILE i < n THEN\n"
+        "VAR i = i + step\n"
+        "IF i == 2.0 THEN CONTINUE\n"
+        "IF i > 5.0 THEN BREAK\n"
+        "VAR s = s + i * 0.5\n"
+        "END\n"
+        "RETURN s\n"
+        "END"
+    )
+    check(
+        function,
+        [(0.0, 1.0), (4.0, 1.0), (10.0, 1.0), (10.0, 0.75), (3.0, 0.5), (10, 1)],
+        jitted=True,
+    )
+
+
+def test_int_loop_break_continue():
+    function = define(
+        "FUN f(n)\n"
+        "VAR s = 0\n"
+        "FOR i = 0 TO n STEP 2 THEN\n"
+        "IF i == 4 THEN CONTINUE\n"
+        "IF i >= 12 THEN BREAK\n"
+        "VAR s = s + i * i\n"
+        "END\n"
+        "RETURN s\n"
+        "END"
+    )
+    check(function, [(0,), (5,), (11,), (40,), (9.5,)])
+
+
+#######################################
+# RANDOM EXPRESSIONS
+#######################################
+
+LITERALS = ["0", "1", "2", "3", "0.5", "3.0", "2.25"]
+OPERATORS = ["+", "-", "*", "/", "==", "!=", "<", ">=", "AND", "OR"]
+# Exponents stay small literals so no case computes a huge power
+EXPONENTS = ["2", "3", "0.5", "-1", "0"]
+ARGS = [
+    (0, 0),
+    (2, 3),
+    (-4, 2),
+    (7, -3),
+    (0.0, 0.0),
+    (1.5, -2.0),
+    (-8.0, 0.25),
+    (1e200, 1e200),
+    (3, 0.5),
+    (-0.0, 5.0),
+]
+
+
+def random_expr(rng, depth):
+    if depth == 0 or rng.random() < 0.25:
+        return rng.choice(["a", "b", "a", "b"] + LITERALS)
+    choice = rng.random()
+    if choice < 0.1:
+        return f"(-{random_expr(rng, depth - 1)})"
+    if choice < 0.15:
+        return f"(NOT {random_expr(rng, depth - 1)})"
+    if choice < 0.25:
+        return f"({random_expr(rng, depth - 1)}) ^ {rng.choice(EXPONENTS)}"
+    left = random_expr(rng, depth - 1)
+    right = random_expr(rng, depth - 1)
+    return f"({left} {rng.choice(OPERATORS)} {right})"
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_expression(seed):
+    rng = random.Random(seed)
+    function = define(f"FUN f(a, b) -> {random_expr(rng, 4)}")
+    check(function, ARGS)